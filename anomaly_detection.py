@@ -1,128 +1,70 @@
 # File: anomaly_detection.py
 
 import os
+import io
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.cluster import DBSCAN
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-from tensorflow.keras.models import Sequential  # type: ignore
-from tensorflow.keras.layers import Dense  # type: ignore
-from sklearn.model_selection import train_test_split
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
-
-# Log-Parsing-Funktionen
-def parse_access_log(line):
-    pattern = re.compile(
-        r'(?P<ip>\S+) - - \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status_code>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
+from log_analysis.parsing import DEFAULT_CHUNK_SIZE
+from log_analysis.features import (
+    SAMPLE_SIZE, process_log_file, collect_feature_stats, extract_features, get_log_type,
+    select_features, iter_feature_chunks, fit_scaler_and_sample, append_json_lines,
+)
+from log_analysis.detectors import (
+    AUTOENCODER_FAST, AUTOENCODER_WARM_START, fit_dbscan, train_autoencoder, reconstruction_errors, fit_detectors, score_feature_chunks,
+)
+from log_analysis.models import load_models, saved_autoencoder_weights, score_log_file
+from log_analysis.results import prepare_output_folder, prepare_anomaly_outputs
+
+# Pipeline über alle Dateien in share_logs; Parsing, Features und Detektoren liegen im
+# Paket log_analysis (Detektor-Einstellungen in log_analysis/detectors.py).
+# TensorFlow, scikit-learn und matplotlib werden erst in den Analysefunktionen importiert.
+
+# Streaming-Konfiguration: None verarbeitet jede Datei komplett im Speicher,
+# sonst wird die Datei in DataFrames mit höchstens CHUNK_SIZE Zeilen gelesen
+CHUNK_SIZE = None
+PLOT_POINTS = 100000  # Maximale Anzahl Punkte im Rekonstruktionsfehler-Plot (Streaming)
+
+# Gespeicherte Detektoren aus detector_models.py verwenden (python detector_models.py train ...),
+# statt für jede Datei neu anzupassen; ohne gespeichertes Modell wird wie bisher angepasst
+USE_SAVED_MODELS = False
+
+# Anzahl paralleler Prozesse für die Analyse der Dateien in share_logs (1 = seriell)
+WORKERS = 1
+
+# Startwerte für den Autoencoder: nur vom Log-Typ abhängig, damit jede Datei seriell
+# wie im Prozess-Pool dasselbe Ergebnis liefert. Das gespeicherte Modell wird nur mit
+# Warmstart geladen, und zwar einmal je Log-Typ (und Prozess).
+start_weights = {}
+
+def autoencoder_start_weights(log_type):
+    if not (AUTOENCODER_FAST and AUTOENCODER_WARM_START):
+        return None
+    if log_type not in start_weights:
+        start_weights[log_type] = saved_autoencoder_weights(log_type)
+    return start_weights[log_type]
+
+# Eine Log-Datei vollständig im Speicher analysieren
+def analyse_log_file(log_file, log_type):
+    from sklearn.ensemble import IsolationForest
+    from sklearn.preprocessing import StandardScaler
+    from log_analysis.plots import (
+        plot_reconstruction_errors, plot_ip_activity, plot_error_anomalies,
+        plot_time_error_anomalies, plot_access_anomalies,
     )
-    match = pattern.match(line)
-    if match:
-        data = match.groupdict()
-        data["timestamp"] = pd.to_datetime(data["timestamp"], format="%d/%b/%Y:%H:%M:%S %z", errors="coerce")
-        data["size"] = None if data["size"] == "-" else int(data["size"])
-        return data
-    return None
-
-def parse_error_log(line):
-    pattern = re.compile(
-        r'(?P<timestamp>\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(?P<severity>error)] (?P<module>[^:]+): \*(?P<pid>\d+) (?P<message>.+), client: (?P<client>[^,]+), server: (?P<server>[^,]+), request: \"(?P<request>[^\"]+)\", host: \"(?P<host>[^\"]+)\"'
-    )
-    match = pattern.match(line)
-    if match:
-        data = match.groupdict()
-        data["timestamp"] = pd.to_datetime(data["timestamp"], format="%Y/%m/%d %H:%M:%S", errors="coerce")
-        return data
-    return None
-
-def parse_myfiles_log(line):
-    pattern = re.compile(
-        r'(?P<ip>\S+) - (?P<user>\S+) \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status_code>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
-    )
-    match = pattern.match(line)
-    if match:
-        data = match.groupdict()
-        data["timestamp"] = pd.to_datetime(data["timestamp"], format="%d/%b/%Y:%H:%M:%S %z", errors="coerce")
-        data["size"] = None if data["size"] == "-" else int(data["size"])
-        return data
-    return None
-
-# Funktion zur Verarbeitung einer einzelnen Log-Datei
-def process_log_file(log_file, log_type):
-    data = []
-    with open(log_file, "r") as file:
-        for line in file:
-            if log_type == "access":
-                entry = parse_access_log(line)
-            elif log_type == "error":
-                entry = parse_error_log(line)
-            elif log_type == "myfiles":
-                entry = parse_myfiles_log(line)
-            else:
-                entry = None
-
-            if entry:
-                entry["log_file"] = os.path.basename(log_file)
-                data.append(entry)
-    return pd.DataFrame(data)
-
-# Funktion zum Extrahieren von zusätzlichen Features
-def extract_features(df, log_type):
-    if log_type == "access" or log_type == "myfiles":
-        df["ip_count"] = df["ip"].map(df["ip"].value_counts())
-        df["user_agent_length"] = df["user_agent"].str.len()
-        df["time_diff"] = df["timestamp"].diff().dt.total_seconds().fillna(0)
-        df["is_suspicious_path"] = df["url"].str.contains(r"(../|.env|.git/config)", regex=True).astype(int)
-        df["status_code"] = df["status_code"].astype(str)
-
-        # Label-Encoding für kategoriale Features
-        status_encoder = LabelEncoder()
-        df["status_code_encoded"] = status_encoder.fit_transform(df["status_code"])
-
-    elif log_type == "error":
-        df["pid"] = df["pid"].astype(int)
-        df["message_length"] = df["message"].str.len()
-
-    return df
-
-# Ordner mit Log-Dateien
-log_folder = "share_logs"
-all_files = [os.path.join(log_folder, f) for f in os.listdir(log_folder) if os.path.isfile(os.path.join(log_folder, f))]
-
-# Ergebnisse speichern
-for log_file in all_files:
-    # Falls Name der Datei mit einem Punkt beginnt, überspringen
-    if os.path.basename(log_file).startswith("."):
-        print(f"Überspringe Datei: {log_file}")
-        continue
-
-    if "myfiles" in os.path.basename(log_file):
-        log_type = "myfiles"
-    elif "access" in os.path.basename(log_file):
-        log_type = "access"
-    elif "error" in os.path.basename(log_file):
-        log_type = "error"
-    else:
-        log_type = "unknown"
-
-    print(f"Verarbeite Datei: {log_file} als Typ: {log_type}")
 
     # Log-Datei einlesen
     df = process_log_file(log_file, log_type)
 
     if df.empty:
         print(f"Datei {log_file} ist leer oder enthält ungültige Daten.")
-        continue
+        return
 
     # Feature-Engineering
     df = extract_features(df, log_type)
-
-    if log_type == "error":
-        features = df[["pid", "message_length"]]
-    else:
-        features = df[["ip_count", "status_code_encoded", "user_agent_length", "time_diff", "is_suspicious_path"]]
+    features = select_features(df, log_type)
 
     # Unsupervised Learning mit Isolation Forest
     scaler = StandardScaler()
@@ -135,29 +77,14 @@ for log_file in all_files:
     print(f"Anzahl der Anomalien in {log_file} (Isolation Forest): {len(isolation_anomalies)}")
 
     # Unsupervised Learning mit DBSCAN
-    dbscan = DBSCAN(eps=0.5, min_samples=5)
-    df["dbscan_cluster"] = dbscan.fit_predict(features_scaled)
+    _, df["dbscan_cluster"] = fit_dbscan(features_scaled)
     dbscan_anomalies = df[df["dbscan_cluster"] == -1]
 
     print(f"Anzahl der Anomalien in {log_file} (DBSCAN): {len(dbscan_anomalies)}")
 
     # Autoencoder-Analyse
-    autoencoder = Sequential([
-        Dense(16, activation='relu', input_dim=features_scaled.shape[1]),
-        Dense(8, activation='relu'),
-        Dense(16, activation='relu'),
-        Dense(features_scaled.shape[1], activation='sigmoid')
-    ])
-
-    autoencoder.compile(optimizer='adam', loss='mse')
-
-    # Train/Test-Split
-    X_train, X_test = train_test_split(features_scaled, test_size=0.2, random_state=42)
-    autoencoder.fit(X_train, X_train, epochs=50, batch_size=32, validation_data=(X_test, X_test))
-
-    # Rekonstruktionsfehler berechnen
-    reconstruction_error = autoencoder.predict(features_scaled) - features_scaled
-    reconstruction_error = (reconstruction_error ** 2).mean(axis=1)
+    autoencoder = train_autoencoder(features_scaled, autoencoder_start_weights(log_type))
+    reconstruction_error = reconstruction_errors(autoencoder, features_scaled)
 
     # Anomalien bestimmen
     threshold = np.percentile(reconstruction_error, 95)  # 95. Perzentil als Schwelle
@@ -166,71 +93,24 @@ for log_file in all_files:
     print(f"Anzahl der Anomalien in {log_file} (Autoencoder): {len(autoencoder_anomalies)}")
 
     # Ergebnisse visualisieren und speichern
-    log_file_name = os.path.splitext(os.path.basename(log_file))[0]
-    output_folder = os.path.join("results", log_file_name)
-
-    # Erstelle den Ordner, falls er noch nicht existiert
-    os.makedirs(output_folder, exist_ok=True)
+    output_folder, log_file_name = prepare_output_folder(log_file)
 
     # Rekonstruktionsfehler visualisieren
-    plt.figure(figsize=(12, 6))
-    plt.plot(range(len(reconstruction_error)), reconstruction_error, label="Rekonstruktionsfehler")
-    plt.axhline(y=threshold, color='r', linestyle='--', label="Threshold")
-    plt.xlabel("Zeile im Log")
-    plt.ylabel("Rekonstruktionsfehler")
-    plt.title(f"Anomalien in {log_file} (Autoencoder)")
-    plt.legend()
-    plt.grid(True)
-    plt.savefig(os.path.join(output_folder, f"{log_file_name}_reconstruction_errors.png"))
-    plt.close()
+    plot_reconstruction_errors(range(len(reconstruction_error)), reconstruction_error, threshold, log_file, output_folder, log_file_name)
 
     # Heatmap der IP-Aktivitäten (nur für Access- und MyFiles-Logs)
     if log_type != "error":
         ip_activity = df.groupby("ip")["timestamp"].count().sort_values(ascending=False)
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x=ip_activity.index[:20], y=ip_activity.values[:20], palette="coolwarm")
-        plt.xticks(rotation=90)
-        plt.title(f"Top 20 IP-Adressen nach Anzahl der Anfragen in {log_file}")
-        plt.xlabel("IP-Adresse")
-        plt.ylabel("Anfragen")
-        plt.grid(axis='y')
-        plt.savefig(os.path.join(output_folder, f"{log_file_name}_ip_activity.png"))
-        plt.close()
+        plot_ip_activity(ip_activity, log_file, output_folder, log_file_name)
 
     # Anomalien spezifisch visualisieren
     if log_type == "error":
-        # Scatterplot für Error Logs
-        plt.figure(figsize=(10, 6))
-        plt.scatter(df["pid"], df["message_length"], c=(df["anomaly_score"] == -1), cmap="coolwarm", alpha=0.7)
-        plt.title(f"Anomalien in {log_file} (Error Logs)")
-        plt.xlabel("PID")
-        plt.ylabel("Länge der Fehlermeldung")
-        plt.grid(True)
-        plt.savefig(os.path.join(output_folder, f"{log_file_name}_error_anomalies.png"))
-        plt.close()
-
-        # Fehlerhäufigkeit nach Zeit darstellen
-        plt.figure(figsize=(12, 6))
+        plot_error_anomalies(df, log_file, output_folder, log_file_name)
         df["timestamp"] = pd.to_datetime(df["timestamp"], errors='coerce')
         time_anomalies = df[df["anomaly_score"] == -1].groupby(df["timestamp"].dt.hour).size()
-        plt.bar(time_anomalies.index, time_anomalies.values, color="orange", alpha=0.7)
-        plt.title(f"Häufigkeit der Anomalien nach Stunden in {log_file}")
-        plt.xlabel("Stunde des Tages")
-        plt.ylabel("Anzahl der Anomalien")
-        plt.grid(axis='y')
-        plt.savefig(os.path.join(output_folder, f"{log_file_name}_time_error_anomalies.png"))
-        plt.close()
-
+        plot_time_error_anomalies(time_anomalies, log_file, output_folder, log_file_name)
     else:
-        # Scatterplot für Access/MyFiles Logs
-        plt.figure(figsize=(10, 6))
-        plt.scatter(df["time_diff"], df["status_code_encoded"], c=(df["anomaly_score"] == -1), cmap="coolwarm", alpha=0.7)
-        plt.title(f"Anomalien in {log_file} (Access/MyFiles Logs)")
-        plt.xlabel("Zeitunterschied zwischen Anfragen (Sekunden)")
-        plt.ylabel("Status-Code (kodiert)")
-        plt.grid(True)
-        plt.savefig(os.path.join(output_folder, f"{log_file_name}_access_anomalies.png"))
-        plt.close()
+        plot_access_anomalies(df, log_file, output_folder, log_file_name)
 
     print(f"Visualisierungen gespeichert in: {output_folder}")
 
@@ -238,4 +118,150 @@ for log_file in all_files:
     dbscan_anomalies.to_json(os.path.join(output_folder, f"{log_file_name}_anomalies_dbscan.json"), orient="records", lines=True)
     autoencoder_anomalies.to_json(os.path.join(output_folder, f"{log_file_name}_anomalies_autoencoder.json"), orient="records", lines=True)
 
-print("Analyse abgeschlossen.")
+    return {
+        "rows": len(df),
+        "isolation_forest": len(isolation_anomalies),
+        "dbscan": len(dbscan_anomalies),
+        "autoencoder": len(autoencoder_anomalies),
+        "output_folder": output_folder,
+    }
+
+# Eine Log-Datei in Chunks analysieren, der Speicherbedarf hängt nur von
+# chunk_size und sample_size ab, nicht von der Größe der Datei.
+# Die Detektoren werden auf einer gleichverteilten Stichprobe trainiert
+# und bewerten danach jeden Chunk einzeln.
+def analyse_log_file_streaming(log_file, log_type, chunk_size, sample_size=SAMPLE_SIZE):
+    from log_analysis.plots import (
+        plot_reconstruction_errors, plot_ip_activity, plot_error_anomalies,
+        plot_time_error_anomalies, plot_access_anomalies,
+    )
+
+    # Durchlauf 1: dateiweite Kennzahlen (IP-Häufigkeiten, Statuscodes)
+    stats = collect_feature_stats(log_file, log_type)
+
+    if stats["rows"] == 0:
+        print(f"Datei {log_file} ist leer oder enthält ungültige Daten.")
+        return
+
+    # Durchlauf 2: Scaler inkrementell anpassen und Stichprobe ziehen
+    scaler, sample = fit_scaler_and_sample(iter_feature_chunks(log_file, log_type, stats, chunk_size), log_type, sample_size)
+
+    # Detektoren auf der Stichprobe trainieren
+    sample_scaled = scaler.transform(select_features(sample, log_type))
+    models = fit_detectors(scaler, sample_scaled, autoencoder_start_weights(log_type))
+    sample["anomaly_score"] = models["iso_forest"].predict(sample_scaled)
+
+    output_folder, log_file_name, output_paths = prepare_anomaly_outputs(log_file)
+
+    # Durchlauf 3: alle Chunks bewerten und Anomalien anhängen
+    counts = {name: 0 for name in output_paths}
+    plot_step = max(1, stats["rows"] // PLOT_POINTS)
+    plot_lines, plot_errors = [], []
+    time_anomalies = pd.Series(dtype=int)
+    offset = 0
+    feature_chunks = iter_feature_chunks(log_file, log_type, stats, chunk_size)
+    for chunk, reconstruction_error, anomalies in score_feature_chunks(feature_chunks, log_type, models):
+        for name, anomaly_df in anomalies.items():
+            counts[name] += len(anomaly_df)
+            append_json_lines(anomaly_df, output_paths[name])
+
+        line_numbers = np.arange(offset, offset + len(chunk))
+        keep = line_numbers % plot_step == 0
+        plot_lines.append(line_numbers[keep])
+        plot_errors.append(reconstruction_error[keep])
+        offset += len(chunk)
+
+        if log_type == "error":
+            hours = pd.to_datetime(chunk["timestamp"], errors='coerce').dt.hour
+            chunk_time_anomalies = anomalies["isolation_forest"].groupby(hours).size()
+            time_anomalies = time_anomalies.add(chunk_time_anomalies, fill_value=0)
+
+    print(f"Anzahl der Anomalien in {log_file} (Isolation Forest): {counts['isolation_forest']}")
+    print(f"Anzahl der Anomalien in {log_file} (DBSCAN): {counts['dbscan']}")
+    print(f"Anzahl der Anomalien in {log_file} (Autoencoder): {counts['autoencoder']}")
+
+    # Visualisierungen aus Stichprobe und ausgedünnten Fehlerwerten
+    plot_reconstruction_errors(np.concatenate(plot_lines), np.concatenate(plot_errors), models["threshold"], log_file, output_folder, log_file_name)
+    if log_type == "error":
+        plot_error_anomalies(sample, log_file, output_folder, log_file_name)
+        plot_time_error_anomalies(time_anomalies.sort_index(), log_file, output_folder, log_file_name)
+    else:
+        ip_activity = pd.Series(stats["ip_counts"]).sort_values(ascending=False)
+        plot_ip_activity(ip_activity, log_file, output_folder, log_file_name)
+        plot_access_anomalies(sample, log_file, output_folder, log_file_name)
+
+    print(f"Visualisierungen gespeichert in: {output_folder}")
+
+    return dict(counts, rows=stats["rows"], output_folder=output_folder)
+
+# Eine Datei aus share_logs analysieren, liefert die Zusammenfassung oder None
+def analyse_share_log(log_file):
+    # Falls Name der Datei mit einem Punkt beginnt, überspringen
+    if os.path.basename(log_file).startswith("."):
+        print(f"Überspringe Datei: {log_file}")
+        return None
+
+    log_type = get_log_type(log_file)
+
+    print(f"Verarbeite Datei: {log_file} als Typ: {log_type}")
+
+    models = None
+    if USE_SAVED_MODELS and log_type != "unknown":
+        models = load_models(log_type)
+
+    if models is not None:
+        summary = score_log_file(log_file, log_type, models, CHUNK_SIZE or DEFAULT_CHUNK_SIZE)
+    elif CHUNK_SIZE is None:
+        summary = analyse_log_file(log_file, log_type)
+    else:
+        summary = analyse_log_file_streaming(log_file, log_type, CHUNK_SIZE)
+
+    if summary is not None:
+        summary.update(log_file=log_file, log_type=log_type)
+    return summary
+
+# Aufgabe für den Prozess-Pool: Ausgaben werden gepuffert und vom Hauptprozess
+# in Dateireihenfolge ausgegeben, damit sie der seriellen Ausführung entsprechen
+def analyse_share_log_task(log_file):
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        summary = analyse_share_log(log_file)
+    return buffer.getvalue(), summary
+
+# Gesamtübersicht aller analysierten Dateien ausgeben
+def print_summary(summaries):
+    summaries = [summary for summary in summaries if summary is not None]
+    print(f"Zusammenfassung ({len(summaries)} Dateien):")
+    for summary in summaries:
+        print(
+            f"- {summary['log_file']} ({summary['log_type']}): {summary['rows']} Zeilen, "
+            f"Isolation Forest: {summary['isolation_forest']}, DBSCAN: {summary['dbscan']}, "
+            f"Autoencoder: {summary['autoencoder']} -> {summary['output_folder']}"
+        )
+    print(
+        f"Gesamt: {sum(summary['rows'] for summary in summaries)} Zeilen, "
+        f"Isolation Forest: {sum(summary['isolation_forest'] for summary in summaries)}, "
+        f"DBSCAN: {sum(summary['dbscan'] for summary in summaries)}, "
+        f"Autoencoder: {sum(summary['autoencoder'] for summary in summaries)}"
+    )
+
+# Alle Dateien in log_folder analysieren, bei workers > 1 parallel in einem Prozess-Pool.
+# TensorFlow ist nicht fork-sicher, daher werden die Worker per "spawn" gestartet.
+def main(log_folder="share_logs", workers=WORKERS):
+    all_files = [os.path.join(log_folder, f) for f in os.listdir(log_folder) if os.path.isfile(os.path.join(log_folder, f))]
+
+    summaries = []
+    if workers <= 1:
+        for log_file in all_files:
+            summaries.append(analyse_share_log(log_file))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            for output, summary in executor.map(analyse_share_log_task, all_files):
+                print(output, end="")
+                summaries.append(summary)
+
+    print_summary(summaries)
+    print("Analyse abgeschlossen.")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 # File: anomaly_log_ai.py
 
 import os
-from anomaly_detection import process_log_file, extract_features
+from log_analysis.features import process_log_file, extract_features
+from log_analysis.models import load_models, score_frame
 from azure_log_generator import send_chat_request
 
 # Funktion zur Interaktion mit dem Benutzer, wenn eine Anomalie gefunden wird
@@ -104,6 +105,15 @@ if __name__ == "__main__":
             print(f"Datei {log_file} ist leer oder enthält ungültige Daten.")
             continue
 
+        # Gespeicherte Detektoren verwenden, falls vorhanden (python detector_models.py train ...)
+        models = load_models(log_type, load_autoencoder=False)
+        if models is not None:
+            print(f"Verwende gespeichertes Modell {models['version']} für {log_type}.")
+            df = score_frame(df, log_type, models)
+            isolation_anomalies = df[df["anomaly_score"] == -1]
+            handle_anomalies(df, isolation_anomalies, log_type, log_file)
+            continue
+
         # Feature-Engineering
         df = extract_features(df, log_type)
 
@@ -1,41 +1,304 @@
 # File: app.py
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, JSONResponse, PlainTextResponse
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel
+from typing import Optional
 import joblib
-import pandas as pd
-import requests
+import httpx
 import os
-import mysql.connector
 import random
 import datetime
-import google.generativeai as genai
+import asyncio
 import logging
+import hashlib
+import hmac
+import json
+import time
+import atexit
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-
-# Logging-Konfiguration
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("gemini_logs.log"),  # Logs werden in Datei geschrieben
-        logging.StreamHandler(),                # Logs erscheinen im Terminal
-    ],
-)
+from prediction_batcher import PredictionBatcher
+from prediction_cache import PredictionCache
+from value_sampler import ValueSampler
+from mysql_db import connection
+from azure_client import AzureChatClient
+from gemini_sessions import GeminiBackend, FakeGeminiBackend, GeminiSessionStore
+from upload_lines import MultipartLineReader, multipart_boundary
+from metrics import MetricsRegistry, RequestMetricsMiddleware, SIZE_BUCKETS
+from request_logging import setup_queue_logging, truncate, sample_payload, log_request
+from forest_arrays import FOREST_ARRAYS_PATH, export_forest, load_array_forest
+from text_model_store import TEXT_MODEL_FOLDER, latest_text_model_version, text_model_versions, load_text_model
+from log_preprocessing import TEXT_PIPELINE_PATH, preprocess_logs_text, transform_preprocessed
 
 # .env-Datei laden 
 load_dotenv()
 
+# Logging-Konfiguration: Logs werden in Datei geschrieben und erscheinen im Terminal.
+# Mit LOG_QUEUE=1 schreibt ein Hintergrund-Thread, die Anfragen warten nicht auf die Platte.
+# Standard ist wie bisher direktes Schreiben: Im Vergleich mit load_test_predict.py
+# --compare-logging war kein Unterschied über das Messrauschen hinaus messbar.
+LOG_QUEUE = os.getenv("LOG_QUEUE", "0") == "1"
+log_handlers = [logging.FileHandler("gemini_logs.log"), logging.StreamHandler()]
+if LOG_QUEUE:
+    log_listener = setup_queue_logging(log_handlers)
+    atexit.register(log_listener.stop)
+else:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=log_handlers,
+    )
+
+# Request-Logging: "sampled" schreibt eine strukturierte Zeile je Anfrage und nur für
+# den Anteil LOG_PAYLOAD_SAMPLE_RATE die (gekürzten) Log-Daten, "full" loggt wie früher
+# alle Eingaben und Ergebnisse vollständig (zum Vergleich im Lasttest)
+REQUEST_LOG_MODE = os.getenv("REQUEST_LOG_MODE", "sampled")
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "500"))
+
 # Azure OpenAI-Konfigurationsvariablen
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_API_VERSION = "2023-05-15"
 GPT_DEPLOYMENT_NAME = "gpt-4o"
 
+# /azure-ai: Zeitlimit je Anfrage, gleichzeitige Anfragen und Cache-Dauer der Antworten
+AZURE_TIMEOUT_SECONDS = float(os.getenv("AZURE_TIMEOUT_SECONDS", "30"))
+AZURE_MAX_CONCURRENCY = int(os.getenv("AZURE_MAX_CONCURRENCY", "8"))
+AZURE_CACHE_TTL_SECONDS = float(os.getenv("AZURE_CACHE_TTL_SECONDS", "3600"))
+AZURE_CACHE_SIZE = int(os.getenv("AZURE_CACHE_SIZE", "1000"))
+
+# Micro-Batching für /predict-text: Anfragen innerhalb von PREDICT_BATCH_WAIT_MS
+# werden zu Batches mit höchstens PREDICT_BATCH_SIZE Logs zusammengefasst
+PREDICT_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_SIZE", "64"))
+PREDICT_BATCH_WAIT_MS = float(os.getenv("PREDICT_BATCH_WAIT_MS", "5"))
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", "1"))
+
+# Maximale Anzahl zwischengespeicherter Vorhersagen (0 = ohne Cache)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "10000"))
+
+# Anfragen mit mehr Zeilen werden in einem Thread vorverarbeitet statt in der Event-Loop
+PREPROCESS_INLINE_LINES = int(os.getenv("PREPROCESS_INLINE_LINES", "64"))
+
+# /random: Größe der Stichprobe aus myfiles_logs und Abstand der Aktualisierungen
+RANDOM_SAMPLE_SIZE = int(os.getenv("RANDOM_SAMPLE_SIZE", "10000"))
+RANDOM_REFRESH_SECONDS = float(os.getenv("RANDOM_REFRESH_SECONDS", "300"))
+
+# /predict-file: Zeilen pro Vorhersage-Batch und maximale Länge einer Zeile
+PREDICT_FILE_BATCH_SIZE = int(os.getenv("PREDICT_FILE_BATCH_SIZE", "512"))
+PREDICT_FILE_MAX_LINE_BYTES = int(os.getenv("PREDICT_FILE_MAX_LINE_BYTES", "65536"))
+
+CLASSIFIER_PATH = "log_classifier.pkl"
+
+# Modellartefakte: MODEL_MMAP_MODE="r" bildet die Arrays aus models/text_classifier per
+# Memory-Mapping ab (leer = vollständig in den Speicher laden). MODEL_WATCH_SECONDS > 0
+# prüft in diesem Abstand, ob LATEST auf eine neue Version zeigt, und lädt sie dann.
+# /admin/reload-model verlangt den Header X-Admin-Token mit dem Wert von ADMIN_TOKEN;
+# ohne ADMIN_TOKEN ist der Endpunkt gesperrt (403).
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+MODEL_WATCH_SECONDS = float(os.getenv("MODEL_WATCH_SECONDS", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Vorhersage-Backend: "sklearn" (predict_proba des RandomForest) oder "arrays"
+# (forest_arrays.py: gleiche Wahrscheinlichkeiten, schneller bei kleinen Batches)
+PREDICT_BACKEND = os.getenv("PREDICT_BACKEND", "sklearn")
+
+# Metriken für /metrics (Prometheus-Textformat)
+metrics = MetricsRegistry()
+requests_total = metrics.counter("api_requests_total", "Anfragen je Route, Methode und Statuscode.", ["route", "method", "status"])
+request_seconds = metrics.histogram("api_request_duration_seconds", "Dauer der Anfragen je Route.", label_names=["route"])
+predict_stage_seconds = metrics.histogram(
+    "predict_stage_duration_seconds",
+    "Dauer der Vorhersage-Schritte (cache_lookup, batch_wait, transform, predict_proba, serialize).",
+    label_names=["stage"],
+)
+predict_batch_logs = metrics.histogram("predict_batch_logs", "Logs je Vorhersage-Batch (transform/predict_proba).", SIZE_BUCKETS)
+predict_request_logs = metrics.histogram("predict_request_logs", "Logs je Anfrage an /predict-text.", SIZE_BUCKETS)
+llm_seconds = metrics.histogram(
+    "llm_upstream_duration_seconds",
+    "Antwortzeit der LLM-Dienste (request: ganze Antwort, first_chunk/stream: Streaming).",
+    label_names=["backend", "kind"],
+)
+
+# Modell und Pipeline (Vorverarbeitung + TF-IDF wie im Training) werden beim Start
+# des Servers geladen, nicht beim Import. Alles, was zu einer Modellversion gehört,
+# steckt in einem Dict, das beim Neuladen als Ganzes ersetzt wird: Laufende Batches
+# rechnen mit der Version zu Ende, mit der sie begonnen haben.
+classifier = None
+reload_lock = asyncio.Lock()
+
+prediction_cache = PredictionCache(PREDICT_CACHE_SIZE)
+
+# Version der Modelldateien aus Änderungszeit und Größe
+def artifact_version(paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        file_stat = os.stat(path)
+        digest.update(f"{path}:{file_stat.st_mtime_ns}:{file_stat.st_size};".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+# Modell aus models/text_classifier laden (per Memory-Mapping), sonst aus den
+# Dateien von log_classification.py; blockiert, deshalb beim Neuladen im Thread
+def read_classifier(version=None):
+    bundle = load_text_model(version, mmap_mode=MODEL_MMAP_MODE, backend=PREDICT_BACKEND)
+    if bundle is not None:
+        bundle["source"] = os.path.join(TEXT_MODEL_FOLDER, bundle["version"])
+    elif PREDICT_BACKEND == "arrays" and os.path.isfile(FOREST_ARRAYS_PATH):
+        bundle = {
+            "model": load_array_forest(FOREST_ARRAYS_PATH, MODEL_MMAP_MODE),
+            "pipeline": joblib.load(TEXT_PIPELINE_PATH),
+            "version": artifact_version([FOREST_ARRAYS_PATH, TEXT_PIPELINE_PATH]),
+            "metadata": {},
+            "source": FOREST_ARRAYS_PATH,
+        }
+    else:
+        model = joblib.load(CLASSIFIER_PATH)
+        bundle = {
+            "model": export_forest(model) if PREDICT_BACKEND == "arrays" else model,
+            "pipeline": joblib.load(TEXT_PIPELINE_PATH),
+            "version": artifact_version([CLASSIFIER_PATH, TEXT_PIPELINE_PATH]),
+            "metadata": {},
+            "source": CLASSIFIER_PATH,
+        }
+    bundle["backend"] = PREDICT_BACKEND
+    bundle["loaded_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    return bundle
+
+# Geladenes Modell aktivieren; zwischengespeicherte Vorhersagen werden verworfen
+def activate_classifier(bundle):
+    global classifier
+    classifier = bundle
+    prediction_cache.clear()
+    logging.info(f"[INFO] Modellversion {bundle['version']} aktiv ({bundle['source']}).")
+
+def load_classifier(version=None):
+    activate_classifier(read_classifier(version))
+
+# Neue Version im Thread laden und erst danach austauschen; Anfragen laufen währenddessen
+# mit dem bisherigen Modell weiter, bei einem Fehler bleibt es aktiv
+async def reload_classifier(version=None):
+    async with reload_lock:
+        bundle = await asyncio.to_thread(read_classifier, version)
+        previous = classifier["version"] if classifier else None
+        activate_classifier(bundle)
+        return previous
+
+def classifier_info():
+    return {key: classifier[key] for key in ("version", "backend", "source", "loaded_at", "metadata")}
+
+# Einen Batch bereits vorverarbeiteter Logs klassifizieren (läuft im Thread-Pool des Batchers)
+def predict_log_batch(texts):
+    bundle = classifier
+    start = time.perf_counter()
+    features = transform_preprocessed(bundle["pipeline"], texts)
+    transformed = time.perf_counter()
+    predictions = bundle["model"].predict_proba(features)
+    predict_stage_seconds.observe(transformed - start, "transform")
+    predict_stage_seconds.observe(time.perf_counter() - transformed, "predict_proba")
+    predict_batch_logs.observe(len(texts))
+    return predictions
+
+prediction_batcher = PredictionBatcher(
+    predict_log_batch,
+    max_batch_size=PREDICT_BATCH_SIZE,
+    max_wait=PREDICT_BATCH_WAIT_MS / 1000,
+    workers=PREDICT_WORKERS,
+)
+
+# Große Anfragen in einem Thread vorverarbeiten, damit die Event-Loop frei bleibt
+async def off_loop(function, logs, *args):
+    if len(logs) <= PREPROCESS_INLINE_LINES:
+        return function(logs, *args)
+    return await asyncio.to_thread(function, logs, *args)
+
+# Vorverarbeiteter Text und Cache-Schlüssel je Log
+def preprocess_with_keys(logs, version):
+    texts = preprocess_logs_text(logs)
+    return texts, [PredictionCache.key(text, version) for text in texts]
+
+# Vorhersagen zuerst im Cache suchen, nur fehlende Zeilen (jede nur einmal)
+# gehen an den Batcher und landen danach im Cache; stats erhält deren Anzahl.
+# Jede Zeile wird nur einmal vorverarbeitet: Der Text dient als Cache-Schlüssel und
+# geht so an den Batcher, der nur noch vektorisiert.
+async def predict_cached(logs, stats=None):
+    start = time.perf_counter()
+    version = classifier["version"]
+    texts, keys = await off_loop(preprocess_with_keys, logs, version)
+    # Jeder Schlüssel wird nur einmal nachgeschlagen, damit doppelte Zeilen einer Anfrage
+    # die Treffer- und Fehlzahlen des Caches nicht verfälschen
+    cached = {key: prediction_cache.get(key) for key in dict.fromkeys(keys)}
+    results = [cached[key] for key in keys]
+
+    missing = {}
+    for text, key, result in zip(texts, keys, results):
+        if result is None and key not in missing:
+            missing[key] = text
+    if stats is not None:
+        stats["predicted"] = len(missing)
+    predict_stage_seconds.observe(time.perf_counter() - start, "cache_lookup")
+    if not missing:
+        return results
+
+    start = time.perf_counter()
+    predictions = await prediction_batcher.predict(list(missing.values()))
+    predict_stage_seconds.observe(time.perf_counter() - start, "batch_wait")
+    computed = {}
+    for key, prediction in zip(missing, predictions):
+        computed[key] = tuple(float(value) for value in prediction)
+        prediction_cache.put(key, computed[key])
+    return [result if result is not None else computed[key] for key, result in zip(keys, results)]
+
+# LATEST regelmäßig prüfen und eine neu gespeicherte Version ohne Neustart übernehmen
+async def watch_text_model():
+    while True:
+        await asyncio.sleep(MODEL_WATCH_SECONDS)
+        version = latest_text_model_version()
+        if version is None or version == classifier["version"]:
+            continue
+        try:
+            await reload_classifier(version)
+        except Exception as e:
+            logging.error(f"[ERROR] Modellversion {version} konnte nicht geladen werden: {str(e)}")
+
+# Stichprobe für /random regelmäßig im Hintergrund erneuern (Datenbankzugriff im Thread)
+async def refresh_value_sample():
+    while True:
+        await asyncio.to_thread(value_sampler.refresh)
+        await asyncio.sleep(RANDOM_REFRESH_SECONDS)
+
+azure_client = AzureChatClient(
+    AZURE_OPENAI_ENDPOINT,
+    AZURE_OPENAI_API_KEY,
+    GPT_DEPLOYMENT_NAME,
+    AZURE_API_VERSION,
+    timeout=AZURE_TIMEOUT_SECONDS,
+    max_concurrency=AZURE_MAX_CONCURRENCY,
+    cache_ttl=AZURE_CACHE_TTL_SECONDS,
+    cache_size=AZURE_CACHE_SIZE,
+    on_latency=lambda kind, seconds: llm_seconds.observe(seconds, "azure", kind),
+)
+
+@asynccontextmanager
+async def lifespan(app):
+    load_classifier()
+    await prediction_batcher.start()
+    await azure_client.start()
+    tasks = [asyncio.create_task(refresh_value_sample())]
+    if MODEL_WATCH_SECONDS > 0:
+        tasks.append(asyncio.create_task(watch_text_model()))
+    yield
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await azure_client.stop()
+    await prediction_batcher.stop()
+    gemini_sessions.shutdown()
+
 # FastAPI App erstellen
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 favicon_path = 'favicon.ico'
 
 class AzureRequest(BaseModel):
@@ -50,9 +313,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Modell und Vektorisierer laden
-log_classifier_model = joblib.load("log_classifier.pkl")
-tfidf_vectorizer = joblib.load("log_vectorizer.pkl")
+# Anfragen je Route zählen und ihre Dauer messen
+app.add_middleware(RequestMetricsMiddleware, requests_total=requests_total, request_seconds=request_seconds)
 
 # API-Klassen
 class LogRequest(BaseModel):
@@ -77,110 +339,245 @@ async def predict_text(request: LogRequest):
     """
     Vorhersage für eingegebene Log-Daten
     """
+    start = time.perf_counter()
     try:
         # Eingehende Logs empfangen
         logs = request.logs
-        logging.info(f"[INFO] Eingehende Log-Daten zur Vorhersage: {logs}")
+        if REQUEST_LOG_MODE == "full":
+            logging.info(f"[INFO] Eingehende Log-Daten zur Vorhersage: {logs}")
 
-        # Logs in DataFrame umwandeln
-        logs_df = pd.DataFrame({"log": logs})
-        logging.debug(f"[DEBUG] DataFrame erstellt: {logs_df.head()}")
+        # Vorhersage aus dem Cache oder im Micro-Batch mit anderen gleichzeitigen Anfragen
+        stats = {}
+        predict_start = time.perf_counter()
+        predictions = await predict_cached(logs, stats)
+        predict_ms = (time.perf_counter() - predict_start) * 1000
 
-        # Transformation der Logs
-        logs_tfidf = tfidf_vectorizer.transform(logs_df["log"])
-        logging.debug(f"[DEBUG] TF-IDF Transformation abgeschlossen.")
-
-        # Vorhersagen durchführen
-        predictions = log_classifier_model.predict_proba(logs_tfidf)
-        logging.debug(f"[DEBUG] Vorhersagen abgeschlossen: {predictions}")
-
-        # Ergebnisse zusammenstellen
+        # Ergebnisse zusammenstellen und als JSON serialisieren
+        serialize_start = time.perf_counter()
         results = [
             {"log": log, "normal": round(prob[0], 2), "malicious": round(prob[1], 2)}
             for log, prob in zip(logs, predictions)
         ]
-        logging.info(f"[INFO] Vorhersageergebnisse: {results}")
-
-        return {"results": results}
+        response = JSONResponse({"results": results})
+        predict_stage_seconds.observe(time.perf_counter() - serialize_start, "serialize")
+        predict_request_logs.observe(len(logs))
+        if REQUEST_LOG_MODE == "full":
+            logging.info(f"[INFO] Vorhersageergebnisse: {results}")
+        else:
+            fields = {}
+            if sample_payload(LOG_PAYLOAD_SAMPLE_RATE):
+                fields["sample"] = truncate(logs[0] if logs else "", LOG_PAYLOAD_MAX_CHARS)
+            log_request(
+                "predict_text",
+                logs=len(logs),
+                predicted=stats.get("predicted", 0),
+                malicious=sum(1 for result in results if result["malicious"] >= 0.5),
+                predict_ms=round(predict_ms, 2),
+                total_ms=round((time.perf_counter() - start) * 1000, 2),
+                **fields,
+            )
+
+        return response
     except Exception as e:
         logging.error(f"[ERROR] Fehler bei der Vorhersage: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Fehler bei der Verarbeitung: {e}")
 
-@app.post("/azure-ai")
-async def azure_ai(request: AzureRequest):
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": AZURE_OPENAI_API_KEY,
-    }
-
-    payload = {
-        "messages": [
-            {"role": "system", "content": "Analysiere den folgenden Log-Eintrag und liefere eine Bewertung."},
-            {"role": "user", "content": request.log},
-        ]
-    }
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Metriken im Prometheus-Textformat
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/predict-cache")
+async def predict_cache_stats():
+    """
+    Treffer und Fehlschläge des Vorhersage-Caches
+    """
+    return dict(prediction_cache.stats(), model_version=classifier["version"])
 
-    url = f"{AZURE_OPENAI_ENDPOINT}/openai/deployments/{GPT_DEPLOYMENT_NAME}/chat/completions?api-version={AZURE_API_VERSION}"
+class ReloadModelRequest(BaseModel):
+    version: Optional[str] = None
 
+@app.get("/model")
+async def model_info():
+    """
+    Aktuell geladene Modellversion
+    """
+    return classifier_info()
+
+@app.post("/admin/reload-model")
+async def reload_model(request: Request, body: Optional[ReloadModelRequest] = None):
+    """
+    Modell neu laden, ohne laufende Anfragen abzubrechen: ohne Angabe die Version
+    aus LATEST (bzw. die Dateien von log_classification.py), sonst die angegebene Version
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Neuladen deaktiviert: ADMIN_TOKEN ist nicht gesetzt.")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Ungültiges Admin-Token.")
+    version = body.version if body else None
+    if version is not None and version not in text_model_versions():
+        raise HTTPException(status_code=404, detail=f"Modellversion {version} nicht gefunden.")
+    try:
+        previous = await reload_classifier(version)
+    except Exception as e:
+        logging.error(f"[ERROR] Fehler beim Neuladen des Modells: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Fehler beim Neuladen des Modells: {e}")
+    return dict(classifier_info(), previous_version=previous)
+
+# StreamingResponse, die nicht parallel auf das Verbindungsende wartet: Der Generator
+# liest den Request-Body selbst noch, während die Antwort schon gesendet wird.
+# Ein Verbindungsabbruch endet wie bei StreamingResponse als ClientDisconnect.
+class UploadStreamingResponse(StreamingResponse):
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+# Vorhersagen für einen Batch von Zeilen als NDJSON-Zeilen (numbers: Zeilennummern in der Datei)
+async def predict_file_batch(batch, numbers):
+    predictions = await prediction_batcher.predict(await off_loop(preprocess_logs_text, batch))
+    lines = []
+    for number, log, prob in zip(numbers, batch, predictions):
+        lines.append(json.dumps({
+            "line": number,
+            "log": log,
+            "normal": round(float(prob[0]), 2),
+            "malicious": round(float(prob[1]), 2),
+        }, ensure_ascii=False) + "\n")
+    return "".join(lines), sum(1 for prob in predictions if prob[1] >= 0.5)
+
+async def stream_file_predictions(request, boundary):
+    reader = MultipartLineReader(boundary, "file", PREDICT_FILE_MAX_LINE_BYTES)
+    summary = {"lines": 0, "scored": 0, "malicious": 0, "normal": 0, "empty": 0, "skipped": 0}
+    batch = []
+    numbers = []
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return {"response": data["choices"][0]["message"]["content"]}
-    except requests.exceptions.RequestException as e:
+        async for line in reader.iter_lines(request.stream()):
+            summary["lines"] += 1
+            # Zu lange Zeilen werden nicht bewertet, zählen aber für die Zeilennummern
+            if line is None:
+                summary["skipped"] += 1
+                continue
+            if not line.strip():
+                summary["empty"] += 1
+                continue
+            batch.append(line)
+            numbers.append(summary["lines"])
+            if len(batch) >= PREDICT_FILE_BATCH_SIZE:
+                output, malicious = await predict_file_batch(batch, numbers)
+                summary["scored"] += len(batch)
+                summary["malicious"] += malicious
+                batch = []
+                numbers = []
+                yield output
+        if batch:
+            output, malicious = await predict_file_batch(batch, numbers)
+            summary["scored"] += len(batch)
+            summary["malicious"] += malicious
+            yield output
+    except ClientDisconnect:
+        logging.warning(f"[WARNING] Upload nach {summary['lines']} Zeilen vom Client abgebrochen.")
+        return
+    except Exception as e:
+        logging.error(f"[ERROR] Fehler bei der Vorhersage für die Datei: {str(e)}")
+        yield json.dumps({"error": f"Fehler bei der Verarbeitung: {e}"}, ensure_ascii=False) + "\n"
+        return
+    summary["normal"] = summary["scored"] - summary["malicious"]
+    log_request("predict_file", **summary)
+    yield json.dumps({"summary": summary}) + "\n"
+
+@app.post("/predict-file")
+async def predict_file(request: Request):
+    """
+    Vorhersage für eine hochgeladene Log-Datei (multipart/form-data, Feld "file").
+    Die Datei wird gelesen, während sie eintrifft, in Batches vorhergesagt und als
+    NDJSON zurückgegeben: eine Zeile je Log-Eintrag, am Ende {"summary": {...}}.
+    Vorhersagen für Dateien gehen am Cache vorbei, damit große Dateien ihn nicht verdrängen.
+    """
+    boundary = multipart_boundary(request.headers.get("content-type", ""))
+    if boundary is None:
+        raise HTTPException(status_code=400, detail="Erwartet wird ein multipart/form-data-Upload.")
+    return UploadStreamingResponse(stream_file_predictions(request, boundary), media_type="application/x-ndjson")
+
+@app.post("/azure-ai")
+async def azure_ai(request: AzureRequest):
+    try:
+        return {"response": await azure_client.analyse(request.log)}
+    except httpx.TimeoutException as e:
+        logging.error(f"[ERROR] Azure OpenAI Zeitüberschreitung: {str(e)}")
+        raise HTTPException(status_code=504, detail="Azure OpenAI Zeitüberschreitung")
+    except httpx.HTTPError as e:
         logging.error(f"[ERROR] Azure OpenAI Fehler: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Azure OpenAI Fehler: {e}")
 
-DB_HOST = "localhost"
-DB_USER = "root"
-DB_PASSWORD = ""
-DB_NAME = "log_generator"
-
-# Verbindung zur Datenbank
-def connect_to_db():
-    return mysql.connector.connect(
-        host=DB_HOST,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
+# Textstücke als Server-Sent Events weiterleiten; am Ende folgt ein "done"-Event,
+# bei einem Fehler ein "error"-Event (der Statuscode ist dann bereits gesendet)
+def sse_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def sse_stream(chunks, source):
+    try:
+        async for text in chunks:
+            yield sse_event({"text": text})
+        yield sse_event({}, "done")
+    except Exception as e:
+        logging.error(f"[ERROR] {source} Fehler beim Streamen: {str(e)}")
+        yield sse_event({"detail": f"{source} Fehler: {e}"}, "error")
+
+def sse_response(chunks, source):
+    return StreamingResponse(
+        sse_stream(chunks, source),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
+@app.post("/azure-ai/stream")
+async def azure_ai_stream(request: AzureRequest):
+    """
+    Wie /azure-ai, die Antwort kommt aber stückweise als Server-Sent Events
+    """
+    return sse_response(azure_client.stream(request.log), "Azure OpenAI")
+
+@app.get("/azure-ai/stats")
+async def azure_ai_stats():
+    """
+    Anfragen und Cache-Treffer des Azure-OpenAI-Clients
+    """
+    return azure_client.stats()
+
+# Zufällige ip/user/url-Werte kommen aus einer Stichprobe im Speicher statt aus
+# ORDER BY RAND() mit einer Verbindung je Anfrage
+value_sampler = ValueSampler(connection, "myfiles_logs", ["ip", "user", "url"], sample_size=RANDOM_SAMPLE_SIZE)
+
+RANDOM_EMPTY_MESSAGES = {
+    "ip": "Keine IP gefunden",
+    "user": "Kein Benutzer gefunden",
+    "url": "Keine URL gefunden",
+}
+
 # Zufälligen Wert aus einer Tabelle abrufen
 @app.get("/random/{attribute}")
 async def random_value(attribute: str):
-    try:
-        conn = connect_to_db()
-        cursor = conn.cursor(dictionary=True)
-
-        if attribute == "ip":
-            cursor.execute("SELECT ip FROM myfiles_logs ORDER BY RAND() LIMIT 1")
-            result = cursor.fetchone()
-            return {"value": result["ip"] if result else "Keine IP gefunden"}
-        elif attribute == "user":
-            cursor.execute("SELECT user FROM myfiles_logs ORDER BY RAND() LIMIT 1")
-            result = cursor.fetchone()
-            return {"value": result["user"] if result else "Kein Benutzer gefunden"}
-        elif attribute == "timestamp":
-            timestamp = datetime.datetime.now().strftime("%d/%b/%Y:%H:%M:%S +0000")
-            return {"value": timestamp}
-        elif attribute == "url":
-            cursor.execute("SELECT url FROM myfiles_logs ORDER BY RAND() LIMIT 1")
-            result = cursor.fetchone()
-            return {"value": result["url"] if result else "Keine URL gefunden"}
-        elif attribute == "method":
-            method = random.choice(["GET", "POST", "DELETE"])
-            return {"value": method}
-        else:
-            return {"value": "Unbekanntes Attribut"}
-    except Exception as e:
-        logging.error(f"[ERROR] Datenbankfehler: {str(e)}")
-        return {"error": str(e)}
-    finally:
-        conn.close()
-
-# Google Gemini-API-Schlüssel konfigurieren
+    if attribute in RANDOM_EMPTY_MESSAGES:
+        value = value_sampler.sample(attribute)
+        return {"value": value if value is not None else RANDOM_EMPTY_MESSAGES[attribute]}
+    elif attribute == "timestamp":
+        timestamp = datetime.datetime.now().strftime("%d/%b/%Y:%H:%M:%S +0000")
+        return {"value": timestamp}
+    elif attribute == "method":
+        method = random.choice(["GET", "POST", "DELETE"])
+        return {"value": method}
+    else:
+        return {"value": "Unbekanntes Attribut"}
+
+# Google Gemini-API-Schlüssel
 gemini_api_key = os.getenv("GEMINI_API_KEY")
-genai.configure(api_key=gemini_api_key)
 
 # Generative Modellkonfiguration
 gemini_generation_config = {
@@ -197,37 +594,78 @@ gemini_safety_settings = [
     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
 ]
 
-gemini_model = genai.GenerativeModel(
-    model_name="gemini-1.5-pro-latest",
-    safety_settings=gemini_safety_settings,
-    generation_config=gemini_generation_config,
-)
+# Gemini-Sessions je Client: Länge des Verlaufs, Leerlaufzeit bis zum Verwerfen und
+# parallele Anfragen; GEMINI_BACKEND=fake ersetzt die API durch ein lokales Echo
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "gemini")
+GEMINI_MAX_TURNS = int(os.getenv("GEMINI_MAX_TURNS", "20"))
+GEMINI_MAX_HISTORY_CHARS = int(os.getenv("GEMINI_MAX_HISTORY_CHARS", "20000"))
+GEMINI_IDLE_TIMEOUT_SECONDS = float(os.getenv("GEMINI_IDLE_TIMEOUT_SECONDS", "1800"))
+GEMINI_WORKERS = int(os.getenv("GEMINI_WORKERS", "4"))
+
+if GEMINI_BACKEND == "fake":
+    gemini_backend = FakeGeminiBackend()
+else:
+    gemini_backend = GeminiBackend(
+        gemini_api_key,
+        "gemini-1.5-pro-latest",
+        gemini_generation_config,
+        gemini_safety_settings,
+    )
 
-# Chat-Session erstellen
-gemini_chat_session = gemini_model.start_chat(history=[])
+gemini_sessions = GeminiSessionStore(
+    gemini_backend,
+    max_turns=GEMINI_MAX_TURNS,
+    max_history_chars=GEMINI_MAX_HISTORY_CHARS,
+    idle_timeout=GEMINI_IDLE_TIMEOUT_SECONDS,
+    workers=GEMINI_WORKERS,
+    on_latency=lambda kind, seconds: llm_seconds.observe(seconds, "gemini", kind),
+)
 
 class GeminiChatRequest(BaseModel):
     message: str
+    client_id: Optional[str] = None
+
+# Ohne Client-ID aus der Seite wird die Adresse des Clients verwendet
+def chat_client_id(request, http_request):
+    if request.client_id:
+        return request.client_id
+    return http_request.client.host if http_request.client else "anonymous"
 
 @app.post("/gemini-chat")
-async def gemini_chat(request: GeminiChatRequest):
+async def gemini_chat(request: GeminiChatRequest, http_request: Request):
     """
     API für Gemini-Chat
     """
     try:
         user_message = request.message
-        logging.info(f"Empfangene Nachricht vom Benutzer: {user_message}")
+        client_id = chat_client_id(request, http_request)
+        logging.info(f"Empfangene Nachricht vom Benutzer: {truncate(user_message, LOG_PAYLOAD_MAX_CHARS)}")
 
-        # Gemini-Anfrage senden
-        response = gemini_chat_session.send_message({"role": "user", "parts": [{"text": user_message}]})
-        gemini_response = response.text
+        # Gemini-Anfrage mit dem Verlauf dieses Clients senden
+        gemini_response = await gemini_sessions.send(client_id, user_message)
 
-        logging.info(f"Antwort von Gemini: {gemini_response}")
+        logging.info(f"Antwort von Gemini: {truncate(gemini_response, LOG_PAYLOAD_MAX_CHARS)}")
         return {"response": gemini_response}
     except Exception as e:
         logging.error(f"[ERROR] Fehler bei der Verarbeitung durch Gemini: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Gemini-Chat Fehler: {str(e)}")
 
+@app.post("/gemini-chat/stream")
+async def gemini_chat_stream(request: GeminiChatRequest, http_request: Request):
+    """
+    Wie /gemini-chat, die Antwort kommt aber stückweise als Server-Sent Events
+    """
+    client_id = chat_client_id(request, http_request)
+    logging.info(f"Empfangene Nachricht vom Benutzer: {truncate(request.message, LOG_PAYLOAD_MAX_CHARS)}")
+    return sse_response(gemini_sessions.stream(client_id, request.message), "Gemini-Chat")
+
+@app.get("/gemini-chat/stats")
+async def gemini_chat_stats():
+    """
+    Anzahl aktiver Gemini-Sessions und Einträge im Verlauf
+    """
+    return gemini_sessions.stats()
+
 
 # Starte FastAPI über Uvicorn (optional direkt im Skript)
 if __name__ == "__main__":
@@ -0,0 +1,162 @@
+# File: azure_client.py
+
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+import httpx
+
+SYSTEM_PROMPT = "Analysiere den folgenden Log-Eintrag und liefere eine Bewertung."
+
+# Asynchroner Client für Azure OpenAI (Chat Completions) für /azure-ai:
+# - ein httpx.AsyncClient mit Keep-Alive-Verbindungen für alle Anfragen
+# - Zeitlimits je Anfrage und höchstens max_concurrency gleichzeitige Anfragen
+# - Antworten werden cache_ttl Sekunden je Log-Text zwischengespeichert; gleichzeitige
+#   Anfragen mit demselben Log-Text warten auf dieselbe Antwort
+# Der Endpoint ist frei wählbar, z. B. azure_stub_server.py für lokale Tests.
+class AzureChatClient:
+    def __init__(self, endpoint, api_key, deployment, api_version, timeout=30.0,
+                 max_concurrency=8, cache_ttl=3600.0, cache_size=1000, on_latency=None):
+        self.url = f"{endpoint}/openai/deployments/{deployment}/chat/completions?api-version={api_version}"
+        self.api_key = api_key
+        self.deployment = deployment
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.pending = {}
+        self.client = None
+        self.semaphore = None
+        self.requests = 0
+        self.cache_hits = 0
+        # on_latency(kind, seconds) für Metriken: "request", "first_chunk", "stream"
+        self.on_latency = on_latency
+
+    async def start(self):
+        self.client = httpx.AsyncClient(
+            headers={"Content-Type": "application/json", "api-key": self.api_key or ""},
+            timeout=httpx.Timeout(self.timeout, connect=min(self.timeout, 5.0)),
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+        )
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def stop(self):
+        tasks = list(self.pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.client.aclose()
+        self.client = None
+
+    def record_latency(self, kind, start):
+        if self.on_latency is not None:
+            self.on_latency(kind, time.perf_counter() - start)
+
+    def cache_key(self, log):
+        return hashlib.blake2b(f"{self.deployment}\0{log}".encode("utf-8"), digest_size=16).digest()
+
+    def cached(self, key):
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        expires, content = entry
+        if expires < time.monotonic():
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return content
+
+    def store(self, key, content):
+        if self.cache_ttl <= 0 or self.cache_size <= 0:
+            return
+        self.cache[key] = (time.monotonic() + self.cache_ttl, content)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def payload(self, log):
+        return {
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": log},
+            ]
+        }
+
+    # Bewertung eines Log-Eintrags; Fehler (httpx.HTTPError) gehen an den Aufrufer.
+    # Die Anfrage an Azure läuft als eigener Task des Clients: Bricht ein Aufrufer ab
+    # (z. B. weil der Browser die Verbindung schließt), warten die anderen weiter.
+    async def analyse(self, log):
+        key = self.cache_key(log)
+        content = self.cached(key)
+        if content is not None:
+            self.cache_hits += 1
+            return content
+
+        task = self.pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self.request(key, log))
+            task.add_done_callback(self.request_done)
+            self.pending[key] = task
+        return await asyncio.shield(task)
+
+    async def request(self, key, log):
+        try:
+            async with self.semaphore:
+                self.requests += 1
+                start = time.perf_counter()
+                response = await self.client.post(self.url, json=self.payload(log))
+                response.raise_for_status()
+                content = response.json()["choices"][0]["message"]["content"]
+                self.record_latency("request", start)
+            self.store(key, content)
+            return content
+        finally:
+            del self.pending[key]
+
+    # Fehler abholen, auch wenn kein Aufrufer mehr wartet (sonst "never retrieved")
+    @staticmethod
+    def request_done(task):
+        if not task.cancelled():
+            task.exception()
+
+    # Bewertung als Folge von Textstücken (stream=True, Server-Sent Events von Azure);
+    # eine Antwort aus dem Cache kommt als ein einziges Stück
+    async def stream(self, log):
+        key = self.cache_key(log)
+        content = self.cached(key)
+        if content is not None:
+            self.cache_hits += 1
+            yield content
+            return
+
+        parts = []
+        async with self.semaphore:
+            self.requests += 1
+            start = time.perf_counter()
+            async with self.client.stream("POST", self.url, json=dict(self.payload(log), stream=True)) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    for choice in json.loads(data).get("choices", []):
+                        text = (choice.get("delta") or {}).get("content")
+                        if text:
+                            if not parts:
+                                self.record_latency("first_chunk", start)
+                            parts.append(text)
+                            yield text
+            self.record_latency("stream", start)
+        self.store(key, "".join(parts))
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "cache_size": len(self.cache),
+            "in_flight": len(self.pending),
+        }
@@ -7,6 +7,7 @@ import random
 import time
 import json
 import mysql.connector
+from mysql_db import connection, execute, iter_rows
 from collections import Counter
 
 # Einfache Logging-Funktion
@@ -21,11 +22,6 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_API_VERSION = "2023-05-15"
 GPT_DEPLOYMENT_NAME = "gpt-4o"
 
-# MySQL-Datenbankkonfiguration
-DB_HOST = "localhost"
-DB_USER = "root"
-DB_NAME = "log_generator"
-
 # Konfigurierbare Wartezeiten
 SHORT_DELAY = 1  # Sekunden zwischen erfolgreichen Anfragen
 LONG_DELAY = 30  # Sekunden bei einem Fehler, bevor erneut versucht wird
@@ -36,64 +32,39 @@ DESIRED_NUM_ENTRIES = 100
 # Wiederholte Einträge verfolgen
 REPEATED_ENTRIES_FILE = "repeated_entries.json"
 
-# Verbindung zur MySQL-Datenbank herstellen
-def connect_to_db():
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            database=DB_NAME
-        )
-        log("Datenbankverbindung erfolgreich hergestellt.", "INFO")
-        return conn
-    except mysql.connector.Error as err:
-        log(f"Fehler bei der Verbindung zur Datenbank: {err}", "ERROR")
-        raise SystemExit
-
 # Tabelle erstellen, falls nicht vorhanden
 def create_table_if_not_exists(table_name):
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute(f"""
+    execute(f"""
         CREATE TABLE IF NOT EXISTS {table_name} (
             id INT AUTO_INCREMENT PRIMARY KEY,
             entry TEXT NOT NULL UNIQUE
         )
     """)
-    conn.commit()
-    cursor.close()
-    conn.close()
     log(f"Tabelle '{table_name}' erstellt oder existiert bereits.", "INFO")
 
 # Einträge aus der Datenbank laden
 def load_existing_entries(table_name):
-    conn = connect_to_db()
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT entry FROM {table_name}")
-    results = [row[0] for row in cursor.fetchall()]
-    cursor.close()
-    conn.close()
+    results = [row[0] for row in iter_rows(f"SELECT entry FROM {table_name}")]
     log(f"{len(results)} Einträge aus Tabelle '{table_name}' geladen.", "INFO")
     return results
 
 # Neue Einträge in die Datenbank einfügen
 def save_entries_to_db(table_name, entries):
-    conn = connect_to_db()
-    cursor = conn.cursor()
     successful_inserts = 0
-    for entry in entries:
-        try:
-            cursor.execute(f"INSERT IGNORE INTO {table_name} (entry) VALUES (%s)", (entry,))
-            if cursor.rowcount > 0:
-                log(f"Eintrag erfolgreich hinzugefügt: {entry}", "INFO")
-                successful_inserts += 1
-            else:
-                log(f"Eintrag bereits vorhanden: {entry}", "WARNING")
-        except mysql.connector.Error as err:
-            log(f"Fehler beim Einfügen von Eintrag '{entry}': {err}", "ERROR")
-    conn.commit()
-    cursor.close()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        for entry in entries:
+            try:
+                cursor.execute(f"INSERT IGNORE INTO {table_name} (entry) VALUES (%s)", (entry,))
+                if cursor.rowcount > 0:
+                    log(f"Eintrag erfolgreich hinzugefügt: {entry}", "INFO")
+                    successful_inserts += 1
+                else:
+                    log(f"Eintrag bereits vorhanden: {entry}", "WARNING")
+            except mysql.connector.Error as err:
+                log(f"Fehler beim Einfügen von Eintrag '{entry}': {err}", "ERROR")
+        conn.commit()
+        cursor.close()
     log(f"{successful_inserts} von {len(entries)} neuen Einträgen in Tabelle '{table_name}' gespeichert.", "INFO")
 
 # Einträge in JSON-Datei speichern
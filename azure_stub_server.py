@@ -0,0 +1,52 @@
+# File: azure_stub_server.py
+
+import os
+import json
+import asyncio
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+# Lokaler Ersatz für den Azure-OpenAI-Endpoint (Chat Completions) zum Testen von
+# /azure-ai ohne echten Dienst und ohne Kosten:
+#   uvicorn azure_stub_server:app --port 8001
+#   AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8001 uvicorn app:app
+# STUB_DELAY_SECONDS simuliert die Antwortzeit des Modells; mit "stream": true kommt
+# das erste Wort nach STUB_FIRST_TOKEN_SECONDS, danach je STUB_TOKEN_DELAY_SECONDS ein Wort.
+STUB_DELAY_SECONDS = float(os.getenv("STUB_DELAY_SECONDS", "0.5"))
+STUB_FIRST_TOKEN_SECONDS = float(os.getenv("STUB_FIRST_TOKEN_SECONDS", "0.3"))
+STUB_TOKEN_DELAY_SECONDS = float(os.getenv("STUB_TOKEN_DELAY_SECONDS", "0.05"))
+
+app = FastAPI()
+request_count = 0
+
+@app.post("/openai/deployments/{deployment}/chat/completions")
+async def chat_completions(deployment: str, request: Request):
+    global request_count
+    request_count += 1
+    payload = await request.json()
+    log = payload["messages"][-1]["content"]
+    content = f"Bewertung ({deployment}): {log[:200]}"
+    if payload.get("stream"):
+        return StreamingResponse(stream_words(deployment, content), media_type="text/event-stream")
+    await asyncio.sleep(STUB_DELAY_SECONDS)
+    return {
+        "model": deployment,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}}
+        ],
+    }
+
+# Antwort Wort für Wort im Format der Azure-Streaming-Antworten
+async def stream_words(deployment, content):
+    await asyncio.sleep(STUB_FIRST_TOKEN_SECONDS)
+    words = content.split(" ")
+    for index, word in enumerate(words):
+        text = word if index == len(words) - 1 else word + " "
+        chunk = {"model": deployment, "choices": [{"index": 0, "delta": {"content": text}}]}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(STUB_TOKEN_DELAY_SECONDS)
+    yield "data: [DONE]\n\n"
+
+@app.get("/stats")
+async def stats():
+    return {"requests": request_count}
@@ -0,0 +1,101 @@
+# File: benchmark_forest_arrays.py
+
+import os
+import sys
+import json
+import time
+import tempfile
+import multiprocessing
+import numpy as np
+import joblib
+from python_log_generator import generate_log_entry
+from log_preprocessing import TEXT_PIPELINE_PATH
+from forest_arrays import export_forest, save_array_forest, load_array_forest
+
+# Vergleich sklearn-RandomForest gegen forest_arrays.ArrayForest: Ladezeit, Speicher
+# nach dem Laden (je in einem eigenen Prozess), gleiche Wahrscheinlichkeiten und
+# Zeilen pro Sekunde für verschiedene Batch-Größen.
+# Aufruf: python benchmark_forest_arrays.py [MODEL_PATH]
+MODEL_PATH = "log_classifier.pkl"
+NUM_LOGS = 4096
+BATCH_SIZES = (1, 16, 64, 256, 1024, 4096)
+MIN_SECONDS = 1.0
+USER_AGENTS_FILE = "user_agents.json"
+PATHS_FILE = "paths.json"
+
+def resident_bytes():
+    with open("/proc/self/statm", "r") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+# Läuft im Kindprozess, damit Ladezeit und Speicher nicht vom anderen Modell beeinflusst werden.
+# sklearn wird vorher importiert (die Pipeline braucht es ohnehin), gemessen wird nur das Laden.
+def measure_load(loader, path):
+    import sklearn.ensemble
+    before = resident_bytes()
+    start = time.perf_counter()
+    model = loader(path)
+    elapsed = time.perf_counter() - start
+    return elapsed, resident_bytes() - before, model.n_estimators
+
+def load_sklearn(path):
+    return joblib.load(path)
+
+def load_arrays(path):
+    return load_array_forest(path, mmap_mode="r")
+
+def load_arrays_in_memory(path):
+    return load_array_forest(path, mmap_mode=None)
+
+def sample_logs(num_logs):
+    with open(USER_AGENTS_FILE, "r", encoding="utf-8") as ua_file:
+        user_agents = json.load(ua_file)
+    with open(PATHS_FILE, "r", encoding="utf-8") as paths_file:
+        paths = json.load(paths_file)
+    return [generate_log_entry(user_agents, paths) for _ in range(num_logs)]
+
+# Zeilen pro Sekunde für predict_proba in Batches der Größe batch_size
+def rows_per_second(model, features, batch_size):
+    rows = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < MIN_SECONDS:
+        for offset in range(0, features.shape[0], batch_size):
+            rows += model.predict_proba(features[offset:offset + batch_size]).shape[0]
+            if time.perf_counter() - start >= MIN_SECONDS:
+                break
+    return rows / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    model_path = sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH
+    model = joblib.load(model_path)
+    text_pipeline = joblib.load(TEXT_PIPELINE_PATH)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        forest_path = os.path.join(tmp_dir, "forest_arrays.joblib")
+        start = time.perf_counter()
+        forest = export_forest(model)
+        save_array_forest(forest, forest_path)
+        print(f"[INFO] Export: {len(forest.feature)} Knoten in {time.perf_counter() - start:.2f}s, "
+              f"Datei {os.path.getsize(model_path) / (1024 * 1024):.1f} MB (sklearn) / "
+              f"{os.path.getsize(forest_path) / (1024 * 1024):.1f} MB (Arrays)")
+
+        context = multiprocessing.get_context("spawn")
+        for name, loader, path in [
+            ("sklearn joblib.load", load_sklearn, model_path),
+            ("arrays mmap_mode=r", load_arrays, forest_path),
+            ("arrays im Speicher", load_arrays_in_memory, forest_path),
+        ]:
+            with context.Pool(1) as pool:
+                elapsed, rss, _ = pool.apply(measure_load, (loader, path))
+            print(f"{name:<22} Laden {elapsed * 1000:8.1f} ms, RSS +{rss / (1024 * 1024):6.1f} MB")
+
+    logs = sample_logs(NUM_LOGS)
+    features = text_pipeline.transform(logs)
+    expected = model.predict_proba(features)
+    actual = forest.predict_proba(features)
+    print(f"[INFO] Gleiche Wahrscheinlichkeiten: {np.array_equal(expected, actual)} "
+          f"(max. Abweichung {np.abs(expected - actual).max():.2e})")
+
+    print(f"{'Batch':>6} {'sklearn Zeilen/s':>18} {'arrays Zeilen/s':>18}")
+    for batch_size in BATCH_SIZES:
+        print(f"{batch_size:>6} {rows_per_second(model, features, batch_size):>18,.0f} "
+              f"{rows_per_second(forest, features, batch_size):>18,.0f}")
@@ -0,0 +1,94 @@
+# File: benchmark_log_parser.py
+
+import os
+import re
+import json
+import time
+import tempfile
+from datetime import datetime
+import pandas as pd
+from python_log_generator import generate_log_entry
+from log_analysis.parsing import PARSERS, read_log_file
+
+# Konfiguration des Benchmarks
+NUM_LINES = 200000
+USER_AGENTS_FILE = "user_agents.json"
+PATHS_FILE = "paths.json"
+
+# Bisheriger Parser aus save_logs_to_mysql.py (Regex wird bei jedem Aufruf kompiliert)
+def legacy_parse_myfiles_log(line):
+    pattern = re.compile(
+        r'(?P<ip>\S+) - (?P<user>\S+) \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
+    )
+    match = pattern.match(line)
+    if match:
+        data = match.groupdict()
+        data["timestamp"] = datetime.strptime(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
+        data["size"] = None if data["size"] == "-" else int(data["size"])
+        return data
+    return None
+
+# Bisheriger Parser aus anomaly_detection.py (pd.to_datetime pro Zeile)
+def legacy_pandas_parse_myfiles_log(line):
+    pattern = re.compile(
+        r'(?P<ip>\S+) - (?P<user>\S+) \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status_code>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
+    )
+    match = pattern.match(line)
+    if match:
+        data = match.groupdict()
+        data["timestamp"] = pd.to_datetime(data["timestamp"], format="%d/%b/%Y:%H:%M:%S %z", errors="coerce")
+        data["size"] = None if data["size"] == "-" else int(data["size"])
+        return data
+    return None
+
+# Synthetische Log-Datei mit python_log_generator erzeugen
+def write_synthetic_log(path, num_lines):
+    with open(USER_AGENTS_FILE, "r", encoding="utf-8") as ua_file:
+        user_agents = json.load(ua_file)
+    with open(PATHS_FILE, "r", encoding="utf-8") as paths_file:
+        paths = json.load(paths_file)
+
+    with open(path, "w", encoding="utf-8") as log_file:
+        for _ in range(num_lines):
+            log_file.write(generate_log_entry(user_agents, paths) + "\n")
+
+# Durchsatz eines Parsers über eine Datei messen
+def measure(parser, path):
+    parsed = 0
+    start = time.perf_counter()
+    with open(path, "r") as file:
+        for line in file:
+            if parser(line):
+                parsed += 1
+    elapsed = time.perf_counter() - start
+    return parsed, elapsed
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "myfiles-benchmark.log")
+        print(f"[INFO] Erzeuge {NUM_LINES} synthetische Log-Zeilen...")
+        write_synthetic_log(log_path, NUM_LINES)
+        size_mb = os.path.getsize(log_path) / (1024 * 1024)
+
+        candidates = [
+            ("legacy anomaly_detection (pd.to_datetime)", legacy_pandas_parse_myfiles_log),
+            ("legacy save_logs_to_mysql (strptime)", legacy_parse_myfiles_log),
+            ("log_analysis.parsing myfiles", PARSERS["myfiles"]),
+            ("log_analysis.parsing access", PARSERS["access"]),
+        ]
+
+        for name, parser in candidates:
+            parsed, elapsed = measure(parser, log_path)
+            print(
+                f"[INFO] {name}: {parsed} Zeilen in {elapsed:.2f}s "
+                f"({parsed / elapsed:,.0f} Zeilen/s, {size_mb / elapsed:.1f} MB/s)"
+            )
+
+        # DataFrame-Pfad mit spaltenweiser Zeitstempel-Umwandlung
+        start = time.perf_counter()
+        parsed = len(read_log_file(log_path, "myfiles"))
+        elapsed = time.perf_counter() - start
+        print(
+            f"[INFO] log_analysis.parsing read_log_file (DataFrame): {parsed} Zeilen in {elapsed:.2f}s "
+            f"({parsed / elapsed:,.0f} Zeilen/s, {size_mb / elapsed:.1f} MB/s)"
+        )
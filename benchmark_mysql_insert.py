@@ -0,0 +1,61 @@
+# File: benchmark_mysql_insert.py
+
+import os
+import time
+import tempfile
+from benchmark_log_parser import write_synthetic_log
+from log_analysis.parsing import read_log_file
+from mysql_db import execute, fetch_all
+from save_logs_to_mysql import create_table_if_not_exists, save_to_database, log
+
+# Konfiguration des Benchmarks (benötigt eine lokale MySQL/MariaDB-Instanz,
+# für "load_data" muss local_infile auf dem Server aktiviert sein)
+NUM_LINES = 50000
+BATCH_SIZE = 5000
+TABLE_NAME = "benchmark_myfiles_logs"
+MODES = ["row", "executemany", "load_data"]
+
+FIELDS = {
+    "ip": "VARCHAR(255)",
+    "user": "VARCHAR(255)",
+    "timestamp": "DATETIME",
+    "method": "VARCHAR(10)",
+    "url": "VARCHAR(255)",
+    "http_version": "VARCHAR(10)",
+    "status": "INT",
+    "size": "INT",
+    "referrer": "TEXT",
+    "user_agent": "TEXT",
+    "log_file": "VARCHAR(255)"
+}
+
+def truncate_table(table_name):
+    execute(f"TRUNCATE TABLE {table_name}")
+
+def count_rows(table_name):
+    return fetch_all(f"SELECT COUNT(*) FROM {table_name}")[0][0]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        log_path = os.path.join(tmp_dir, "myfiles-benchmark.log")
+        log(f"Erzeuge {NUM_LINES} synthetische Log-Zeilen...", "INFO")
+        write_synthetic_log(log_path, NUM_LINES)
+        df = read_log_file(log_path, "myfiles", wall_clock=True)
+
+    create_table_if_not_exists(TABLE_NAME, FIELDS)
+
+    results = {}
+    for mode in MODES:
+        truncate_table(TABLE_NAME)
+        start = time.perf_counter()
+        save_to_database(df, TABLE_NAME, mode=mode, batch_size=BATCH_SIZE)
+        elapsed = time.perf_counter() - start
+        inserted = count_rows(TABLE_NAME)
+        results[mode] = inserted / elapsed
+        log(f"{mode}: {inserted} Zeilen in {elapsed:.2f}s ({results[mode]:,.0f} Zeilen/s)", "INFO")
+
+    truncate_table(TABLE_NAME)
+
+    print("Ergebnis (Zeilen pro Sekunde):")
+    for mode, rows_per_second in results.items():
+        print(f"- {mode}: {rows_per_second:,.0f}")
@@ -0,0 +1,79 @@
+# File: benchmark_text_features.py
+
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+import joblib
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from log_preprocessing import build_text_pipeline, build_vectorizer
+
+# Vergleich der Merkmalsmodi für den Klassifikator aus log_classification.py:
+# TF-IDF mit Vokabular gegen gehashte n-Gramme (mit und ohne IDF). Gemessen werden
+# Fit-Zeit und Spitzenspeicher der Pipeline, Größe des gespeicherten Artefakts,
+# Transform-Durchsatz sowie Trainingszeit und Genauigkeit des RandomForest.
+# Aufruf: python benchmark_text_features.py [ZEILEN_PRO_DATEI]
+NORMAL_LOGS_PATH = "myfiles-access_anon.log"
+BAD_LOGS_PATH = "malicious_myfiles_20241214143634.log"
+LINES_TO_READ = 100000
+CANDIDATES = [
+    ("tfidf", "tfidf", True),
+    ("hashing + idf", "hashing", True),
+    ("hashing", "hashing", False),
+]
+
+def read_logs(file_path, num_lines, label):
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as file:
+        lines = [line.strip() for _, line in zip(range(num_lines), file)]
+    return pd.DataFrame({"log": lines, "label": label})
+
+# Spitzenspeicher (Python- und NumPy-Allokationen) beim Anpassen der Pipeline;
+# eigener Durchlauf, weil tracemalloc die Zeitmessung verfälschen würde
+def peak_fit_memory(feature_mode, idf, logs):
+    tracemalloc.start()
+    build_text_pipeline(build_vectorizer(feature_mode, idf=idf)).fit(logs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def artifact_size(text_pipeline):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "pipeline.pkl")
+        joblib.dump(text_pipeline, path)
+        return os.path.getsize(path)
+
+if __name__ == "__main__":
+    lines_to_read = int(sys.argv[1]) if len(sys.argv) > 1 else LINES_TO_READ
+    data = pd.concat([
+        read_logs(NORMAL_LOGS_PATH, lines_to_read, 0),
+        read_logs(BAD_LOGS_PATH, lines_to_read, 1),
+    ]).sample(frac=1, random_state=42).reset_index(drop=True)
+    train_logs, test_logs, y_train, y_test = train_test_split(data["log"], data["label"], test_size=0.2, random_state=42)
+    print(f"[INFO] {len(train_logs)} Trainings- und {len(test_logs)} Testzeilen")
+
+    print(f"{'Modus':<15} {'Fit s':>7} {'Peak MB':>8} {'Artefakt':>10} {'Spalten':>8} "
+          f"{'Transform/s':>12} {'RF-Fit s':>9} {'Accuracy':>9}")
+    for name, feature_mode, idf in CANDIDATES:
+        text_pipeline = build_text_pipeline(build_vectorizer(feature_mode, idf=idf))
+        start = time.perf_counter()
+        X_train = text_pipeline.fit_transform(train_logs)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        X_test = text_pipeline.transform(test_logs)
+        transform_rate = len(test_logs) / (time.perf_counter() - start)
+
+        model = RandomForestClassifier(n_estimators=100, random_state=42, class_weight="balanced")
+        start = time.perf_counter()
+        model.fit(X_train, y_train)
+        model_seconds = time.perf_counter() - start
+        accuracy = accuracy_score(y_test, model.predict(X_test))
+
+        peak = peak_fit_memory(feature_mode, idf, train_logs)
+        size = artifact_size(text_pipeline)
+        print(f"{name:<15} {fit_seconds:>7.2f} {peak / (1024 * 1024):>8.1f} {size / 1024:>8.0f}KB "
+              f"{X_train.shape[1]:>8} {transform_rate:>12,.0f} {model_seconds:>9.2f} {accuracy:>9.4f}")
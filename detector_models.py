@@ -0,0 +1,73 @@
+# File: detector_models.py
+
+import os
+import sys
+import argparse
+from log_analysis.features import SAMPLE_SIZE, get_log_type
+from log_analysis.models import MODEL_FOLDER, CHUNK_SIZE, train_models, save_models, load_models, score_log_file
+
+# Kommandozeile für gespeicherte Detektoren (siehe log_analysis/models.py):
+#   python detector_models.py train share_logs/baseline   Detektoren anpassen und als neue Version speichern
+#   python detector_models.py score share_logs            Dateien nur mit transform/predict bewerten
+
+# Dateien nach Log-Typ gruppieren (versteckte und unbekannte Dateien auslassen)
+def group_log_files(paths):
+    log_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            log_files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            log_files.append(path)
+
+    groups = {}
+    for log_file in log_files:
+        if os.path.basename(log_file).startswith(".") or not os.path.isfile(log_file):
+            continue
+        log_type = get_log_type(log_file)
+        if log_type == "unknown":
+            print(f"Warnung: Der Datei-Typ für {log_file} konnte nicht bestimmt werden. Überspringe diese Datei.")
+            continue
+        groups.setdefault(log_type, []).append(log_file)
+    return groups
+
+def train_command(args):
+    for log_type, log_files in group_log_files(args.paths).items():
+        print(f"Trainiere Detektoren für {log_type} auf {len(log_files)} Dateien...")
+        models = train_models(log_files, log_type, args.chunk_size, args.sample_size)
+        if models is None:
+            print(f"Keine gültigen Zeilen für {log_type} gefunden.")
+            continue
+        version = save_models(models, log_type, args.model_folder)
+        print(f"Modell {version} für {log_type} gespeichert ({models['metadata']['training_rows']} Zeilen).")
+
+def score_command(args):
+    for log_type, log_files in group_log_files(args.paths).items():
+        models = load_models(log_type, args.version, args.model_folder)
+        if models is None:
+            print(f"Kein gespeichertes Modell für {log_type}, bitte zuerst 'train' ausführen.")
+            continue
+        for log_file in log_files:
+            print(f"Bewerte Datei: {log_file} als Typ: {log_type}")
+            score_log_file(log_file, log_type, models, args.chunk_size)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Anomalie-Detektoren trainieren und gespeicherte Modelle anwenden.")
+    parser.add_argument("--model-folder", default=MODEL_FOLDER)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train = commands.add_parser("train", help="Detektoren auf Basis-Logs anpassen und als neue Version speichern")
+    train.add_argument("paths", nargs="+", help="Log-Dateien oder Ordner mit Basis-Logs")
+    train.add_argument("--sample-size", type=int, default=SAMPLE_SIZE)
+    train.set_defaults(handler=train_command)
+
+    score = commands.add_parser("score", help="Log-Dateien mit gespeicherten Detektoren bewerten")
+    score.add_argument("paths", nargs="+", help="Log-Dateien oder Ordner")
+    score.add_argument("--version", default=None, help="Modellversion (Standard: LATEST)")
+    score.set_defaults(handler=score_command)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,148 @@
+# File: forest_arrays.py
+
+import sys
+import numpy as np
+import joblib
+import scipy.sparse as sp
+
+FOREST_ARRAYS_PATH = "log_classifier_arrays.joblib"
+# Obergrenze für die dicht aufgefüllten Zeilen eines Blocks (Zeilen x Merkmale x 4 Byte)
+DENSE_CHUNK_BYTES = 16 * 1024 * 1024
+
+# RandomForestClassifier als zusammenhängende NumPy-Arrays: Die Knoten aller Bäume
+# liegen hintereinander, children[2 * i] / children[2 * i + 1] sind die globalen Indizes
+# des linken/rechten Kindes. Blätter verweisen auf sich selbst (Schwellwert +inf), damit
+# alle (Zeile, Baum)-Paare ohne Sonderfall gleichzeitig eine Ebene tiefer gehen können.
+# leaf_proba enthält je Knoten die normierten Klassenwahrscheinlichkeiten wie in
+# DecisionTreeClassifier.predict_proba. Das Objekt hält nur flache Arrays, deshalb
+# lädt joblib es mit mmap_mode="r" ohne Kopie (anders als sklearn-Bäume, die ihre
+# Knoten beim Laden kopieren). predict_proba liefert dieselben Werte wie sklearn.
+# columns enthält nur die Merkmale, die in den Bäumen vorkommen; feature verweist auf
+# Positionen darin, so bleibt der dichte Block auch bei sehr vielen Merkmalen (z. B.
+# HashingVectorizer) schmal. Ältere Exporte ohne columns verwenden alle Merkmale,
+# feature enthält dort die ursprünglichen Spaltenindizes.
+class ArrayForest:
+    def __init__(self, feature, threshold, children, is_leaf, leaf_proba, roots, columns, classes, n_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.is_leaf = is_leaf
+        self.leaf_proba = leaf_proba
+        self.roots = roots
+        self.columns = columns
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    # Ausgewählte Merkmale oder None (alle), auch für Objekte aus älteren Exporten
+    @property
+    def used_columns(self):
+        return getattr(self, "columns", None)
+
+    def nbytes(self):
+        arrays = [self.feature, self.threshold, self.children, self.is_leaf, self.leaf_proba, self.roots]
+        if self.used_columns is not None:
+            arrays.append(self.used_columns)
+        return sum(array.nbytes for array in arrays)
+
+    # Blatt je (Zeile, Baum) für einen Block aus der CSR-Matrix. Der Block wird dicht
+    # aufgefüllt (fehlende Einträge = 0 wie in sklearn), damit jeder Merkmalszugriff ein
+    # einfacher Index ist; fertige Paare werden regelmäßig aus der Arbeitsmenge entfernt.
+    def leaves(self, X):
+        n_rows = X.shape[0]
+        n_trees = len(self.roots)
+        dense = X.toarray().ravel()
+        nodes = np.tile(self.roots, n_rows)
+        pairs = np.arange(len(nodes))
+        current = nodes.copy()
+        offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * X.shape[1], n_trees)
+        while len(current):
+            for _ in range(8):
+                values = dense[offsets + self.feature[current]]
+                current = self.children[2 * current + (values > self.threshold[current])]
+            done = self.is_leaf[current]
+            nodes[pairs[done]] = current[done]
+            remaining = ~done
+            pairs, current, offsets = pairs[remaining], current[remaining], offsets[remaining]
+        return nodes.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X):
+        # Wie sklearn: float32-Werte, Vergleich mit den float64-Schwellwerten
+        X = sp.csr_matrix(X, dtype=np.float32)
+        if self.used_columns is not None:
+            X = X[:, self.used_columns]
+        proba = np.zeros((X.shape[0], len(self.classes_)), dtype=np.float64)
+        chunk_rows = max(1, DENSE_CHUNK_BYTES // (4 * max(1, X.shape[1])))
+        for start in range(0, X.shape[0], chunk_rows):
+            leaves = self.leaves(X[start:start + chunk_rows])
+            chunk = proba[start:start + chunk_rows]
+            # Summe Baum für Baum in derselben Reihenfolge wie sklearn (gleiche Rundung)
+            for tree in range(leaves.shape[1]):
+                chunk += self.leaf_proba[leaves[:, tree]]
+        proba /= len(self.roots)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+# Trainierten RandomForestClassifier in ein ArrayForest umwandeln
+def export_forest(model):
+    features, thresholds, children, leaves, probas, roots = [], [], [], [], [], []
+    offset = 0
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        own_index = np.arange(tree.node_count) + offset
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        children.append(np.column_stack([
+            np.where(is_leaf, own_index, tree.children_left + offset),
+            np.where(is_leaf, own_index, tree.children_right + offset),
+        ]).astype(np.int64).ravel())
+        leaves.append(is_leaf)
+        value = tree.value[:, 0, :len(model.classes_)].astype(np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        probas.append(value / normalizer)
+        roots.append(offset)
+        offset += tree.node_count
+
+    # Nur tatsächlich verwendete Merkmale behalten (Blätter zeigen auf Spalte 0 der Auswahl)
+    feature = np.concatenate(features)
+    is_leaf = np.concatenate(leaves)
+    columns = np.unique(feature[~is_leaf])
+    if not len(columns):
+        columns = np.zeros(1, dtype=np.int64)
+    feature = np.where(is_leaf, 0, np.searchsorted(columns, feature))
+
+    return ArrayForest(
+        feature=np.ascontiguousarray(feature),
+        threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+        children=np.ascontiguousarray(np.concatenate(children)),
+        is_leaf=np.ascontiguousarray(is_leaf),
+        leaf_proba=np.ascontiguousarray(np.concatenate(probas)),
+        roots=np.array(roots, dtype=np.int64),
+        columns=columns,
+        classes=np.asarray(model.classes_),
+        n_features=model.n_features_in_,
+    )
+
+def save_array_forest(forest, path=FOREST_ARRAYS_PATH):
+    # Unkomprimiert, damit die Arrays per Memory-Mapping geladen werden können
+    joblib.dump(forest, path)
+
+def load_array_forest(path=FOREST_ARRAYS_PATH, mmap_mode="r"):
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+# Export eines bereits gespeicherten Modells:
+# python forest_arrays.py [MODEL_PATH] [FOREST_ARRAYS_PATH]
+if __name__ == "__main__":
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "log_classifier.pkl"
+    forest_path = sys.argv[2] if len(sys.argv) > 2 else FOREST_ARRAYS_PATH
+    forest = export_forest(joblib.load(model_path))
+    save_array_forest(forest, forest_path)
+    print(f"[INFO] {forest.n_estimators} Bäume mit {len(forest.feature)} Knoten "
+          f"({forest.nbytes() / (1024 * 1024):.1f} MB) nach {forest_path} exportiert.")
@@ -0,0 +1,185 @@
+# File: gemini_sessions.py
+
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Backend für Google Gemini: Jede Nachricht wird mit dem (bereits gekürzten)
+# Verlauf des Clients gesendet; google.generativeai wird erst beim ersten Aufruf importiert
+class GeminiBackend:
+    def __init__(self, api_key, model_name, generation_config, safety_settings):
+        self.api_key = api_key
+        self.model_name = model_name
+        self.generation_config = generation_config
+        self.safety_settings = safety_settings
+        self.model = None
+
+    def get_model(self):
+        if self.model is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=self.api_key)
+            self.model = genai.GenerativeModel(
+                model_name=self.model_name,
+                safety_settings=self.safety_settings,
+                generation_config=self.generation_config,
+            )
+        return self.model
+
+    def send(self, history, message):
+        chat = self.get_model().start_chat(history=history)
+        return chat.send_message({"role": "user", "parts": [{"text": message}]}).text
+
+    # Antwort stückweise, sobald Gemini sie liefert
+    def stream(self, history, message):
+        chat = self.get_model().start_chat(history=history)
+        for chunk in chat.send_message({"role": "user", "parts": [{"text": message}]}, stream=True):
+            yield chunk.text
+
+# Lokales Backend für Tests: antwortet ohne API-Aufruf mit der Nachricht und der Länge
+# des Verlaufs, optional mit künstlicher Verzögerung
+class FakeGeminiBackend:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def send(self, history, message):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return f"Echo ({len(history)} Einträge im Verlauf): {message}"
+
+    def stream(self, history, message):
+        self.calls += 1
+        for word in f"Echo ({len(history)} Einträge im Verlauf): {message}".split(" "):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word + " "
+
+class ChatSession:
+    def __init__(self):
+        self.history = []
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+# Chat-Sessions je Client-ID. Der Verlauf wird auf max_turns Wortwechsel und
+# max_history_chars Zeichen begrenzt (älteste Wortwechsel fallen zuerst weg),
+# Sessions ohne Nachricht seit idle_timeout Sekunden werden verworfen.
+# Die Backend-Aufrufe laufen in einem Thread-Pool; Nachrichten desselben Clients
+# werden nacheinander verarbeitet, verschiedene Clients parallel.
+class GeminiSessionStore:
+    def __init__(self, backend, max_turns=20, max_history_chars=20000, idle_timeout=1800.0,
+                 max_sessions=1000, workers=4, on_latency=None):
+        self.backend = backend
+        self.max_turns = max_turns
+        self.max_history_chars = max_history_chars
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini")
+        # on_latency(kind, seconds) für Metriken: "request", "first_chunk", "stream"
+        self.on_latency = on_latency
+        # Reihenfolge nach letzter Nutzung, die am längsten ungenutzte Session steht vorn
+        self.sessions = OrderedDict()
+
+    def record_latency(self, kind, start):
+        if self.on_latency is not None:
+            self.on_latency(kind, time.perf_counter() - start)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+    def evict_idle(self):
+        now = time.monotonic()
+        while self.sessions:
+            client_id, session = next(iter(self.sessions.items()))
+            if now - session.last_used < self.idle_timeout and len(self.sessions) <= self.max_sessions:
+                break
+            if session.lock.locked():
+                break
+            del self.sessions[client_id]
+
+    def get_session(self, client_id):
+        self.evict_idle()
+        session = self.sessions.get(client_id)
+        if session is None:
+            session = self.sessions[client_id] = ChatSession()
+        self.sessions.move_to_end(client_id)
+        session.last_used = time.monotonic()
+        return session
+
+    # Älteste Wortwechsel (Benutzer + Modell) entfernen, bis beide Grenzen eingehalten sind
+    def trim_history(self, history):
+        while history and (
+            len(history) > 2 * self.max_turns
+            or sum(len(entry["parts"][0]["text"]) for entry in history) > self.max_history_chars
+        ):
+            del history[:2]
+
+    async def send(self, client_id, message):
+        session = self.get_session(client_id)
+        async with session.lock:
+            loop = asyncio.get_running_loop()
+            start = time.perf_counter()
+            response = await loop.run_in_executor(self.executor, self.backend.send, list(session.history), message)
+            self.record_latency("request", start)
+            session.history.append({"role": "user", "parts": [{"text": message}]})
+            session.history.append({"role": "model", "parts": [{"text": response}]})
+            self.trim_history(session.history)
+            session.last_used = time.monotonic()
+        return response
+
+    # Synchronen Generator im Thread-Pool durchlaufen und seine Elemente asynchron
+    # weitergeben; bricht der Aufrufer ab, hört der Thread nach dem nächsten Element auf
+    async def iterate_in_thread(self, function, *args):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stopped = threading.Event()
+        done = object()
+
+        def produce():
+            try:
+                for item in function(*args):
+                    if stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, (item, None))
+                loop.call_soon_threadsafe(queue.put_nowait, (done, None))
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, (done, e))
+
+        producer = loop.run_in_executor(self.executor, produce)
+        try:
+            while True:
+                item, error = await queue.get()
+                if item is done:
+                    if error is not None:
+                        raise error
+                    break
+                yield item
+        finally:
+            stopped.set()
+        await producer
+
+    # Wie send(), die Antwort kommt aber stückweise; in den Verlauf geht sie erst vollständig
+    async def stream(self, client_id, message):
+        session = self.get_session(client_id)
+        async with session.lock:
+            parts = []
+            start = time.perf_counter()
+            async for text in self.iterate_in_thread(self.backend.stream, list(session.history), message):
+                if not parts:
+                    self.record_latency("first_chunk", start)
+                parts.append(text)
+                yield text
+            self.record_latency("stream", start)
+            session.history.append({"role": "user", "parts": [{"text": message}]})
+            session.history.append({"role": "model", "parts": [{"text": "".join(parts)}]})
+            self.trim_history(session.history)
+            session.last_used = time.monotonic()
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "history_entries": sum(len(session.history) for session in self.sessions.values()),
+        }
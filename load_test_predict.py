@@ -0,0 +1,220 @@
+# File: load_test_predict.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from python_log_generator import generate_log_entry
+
+# Lasttest für /predict-text: CONCURRENCY Clients senden insgesamt NUM_REQUESTS Anfragen
+# an einen laufenden Server (uvicorn app:app). Parallel misst ein weiterer Client die
+# Latenz von /favicon.ico, um zu zeigen, ob die Event-Loop durch Vorhersagen blockiert.
+# Aufruf: python load_test_predict.py [BASE_URL] [LOGS_PER_REQUEST] [NUM_REQUESTS]
+#
+# --cache unique (Standard) macht jede Log-Zeile eindeutig (auch nach der Vorverarbeitung),
+# damit der Vorhersage-Cache nicht trifft und Batching und Inferenz gemessen werden;
+# --cache repeat verwendet wie früher 500 Beispielzeilen immer wieder (misst vor allem Cache-Treffer).
+# Die Treffer und Fehlzugriffe des Caches während des Laufs werden mit ausgegeben.
+#
+# --compare-logging startet den Server selbst (auf dem Port aus BASE_URL) nacheinander mit
+# jeder Einstellung aus LOGGING_MODES (REQUEST_LOG_MODE, LOG_QUEUE) und vergleicht den
+# Aufwand des Request-Loggings; dafür im Projektverzeichnis aufrufen, z. B.:
+#   python load_test_predict.py http://127.0.0.1:8765 1000 500 --compare-logging
+BASE_URL = "http://127.0.0.1:8000"
+CONCURRENCY = 32
+NUM_REQUESTS = 2000
+LOGS_PER_REQUEST = 1
+SAMPLE_LOGS = 500
+USER_AGENTS_FILE = "user_agents.json"
+PATHS_FILE = "paths.json"
+SERVER_START_TIMEOUT = 120  # Sekunden bis der gestartete Server antwortet
+LOGGING_MODES = [
+    ("full, direkt", {"REQUEST_LOG_MODE": "full", "LOG_QUEUE": "0"}),
+    ("full, Queue", {"REQUEST_LOG_MODE": "full", "LOG_QUEUE": "1"}),
+    ("sampled, direkt", {"REQUEST_LOG_MODE": "sampled", "LOG_QUEUE": "0"}),
+    ("sampled, Queue", {"REQUEST_LOG_MODE": "sampled", "LOG_QUEUE": "1"}),
+]
+
+def load_sample_logs(num_logs):
+    with open(USER_AGENTS_FILE, "r", encoding="utf-8") as ua_file:
+        user_agents = json.load(ua_file)
+    with open(PATHS_FILE, "r", encoding="utf-8") as paths_file:
+        paths = json.load(paths_file)
+    return [generate_log_entry(user_agents, paths) for _ in range(num_logs)]
+
+# Zeile eindeutig machen: Die Vorverarbeitung maskiert IP und Zeitstempel, daher
+# bekommt der Pfad einen Zähler als Parameter
+def unique_log(log, number):
+    request_end = log.find(" HTTP/")
+    if request_end == -1:
+        return f"{log} {number}"
+    separator = "&" if "?" in log[:request_end] else "?"
+    return f"{log[:request_end]}{separator}lt={number}{log[request_end:]}"
+
+def cache_stats(session, base_url):
+    try:
+        response = session.get(f"{base_url}/predict-cache")
+        return response.json() if response.status_code == 200 else None
+    except requests.RequestException:
+        return None
+
+def percentiles(latencies):
+    values = np.array(latencies) * 1000
+    return {name: np.percentile(values, q) for name, q in (("p50", 50), ("p95", 95), ("p99", 99))}
+
+def print_latencies(name, latencies):
+    if not latencies:
+        print(f"{name}: keine Messwerte")
+        return
+    stats = percentiles(latencies)
+    print(
+        f"{name}: {len(latencies)} Anfragen, p50 {stats['p50']:.1f} ms, "
+        f"p95 {stats['p95']:.1f} ms, p99 {stats['p99']:.1f} ms, max {max(latencies) * 1000:.1f} ms"
+    )
+
+# Führt den Lasttest aus, gibt die Ergebnisse aus und liefert Durchsatz und Latenzen
+def run_load_test(base_url=BASE_URL, concurrency=CONCURRENCY, num_requests=NUM_REQUESTS,
+                  logs_per_request=LOGS_PER_REQUEST, cache_mode="unique"):
+    sample_logs = load_sample_logs(SAMPLE_LOGS)
+    local = threading.local()
+    errors = []
+
+    def request_logs(index):
+        if cache_mode == "repeat":
+            return [sample_logs[(index + offset) % len(sample_logs)] for offset in range(logs_per_request)]
+        first = index * logs_per_request
+        return [
+            unique_log(sample_logs[(first + offset) % len(sample_logs)], first + offset)
+            for offset in range(logs_per_request)
+        ]
+
+    def send_request(index):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        logs = request_logs(index)
+        start = time.perf_counter()
+        response = local.session.post(f"{base_url}/predict-text", json={"logs": logs})
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            errors.append(response.status_code)
+        return elapsed
+
+    # Favicon-Latenz während des Lasttests messen
+    favicon_latencies = []
+    done = threading.Event()
+
+    def probe_favicon():
+        with requests.Session() as session:
+            while not done.is_set():
+                start = time.perf_counter()
+                session.get(f"{base_url}/favicon.ico")
+                favicon_latencies.append(time.perf_counter() - start)
+                time.sleep(0.01)
+
+    with requests.Session() as session:
+        cache_before = cache_stats(session, base_url)
+
+    probe = threading.Thread(target=probe_favicon, daemon=True)
+    probe.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(send_request, range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    probe.join()
+
+    with requests.Session() as session:
+        cache_after = cache_stats(session, base_url)
+
+    print(
+        f"{num_requests} Anfragen à {logs_per_request} Logs mit {concurrency} parallelen Clients in {elapsed:.2f}s "
+        f"({num_requests / elapsed:,.0f} Anfragen/s, {num_requests * logs_per_request / elapsed:,.0f} Logs/s)"
+    )
+    if cache_before is not None and cache_after is not None:
+        hits = cache_after["hits"] - cache_before["hits"]
+        misses = cache_after["misses"] - cache_before["misses"]
+        rate = hits / (hits + misses) if hits + misses else 0.0
+        print(f"Modus: --cache {cache_mode}, Vorhersage-Cache: {hits} Treffer, {misses} Fehlzugriffe ({rate:.1%})")
+    else:
+        print(f"Modus: --cache {cache_mode} (Cache-Statistik nicht verfügbar)")
+    print_latencies("/predict-text", latencies)
+    print_latencies("/favicon.ico", favicon_latencies)
+    if errors:
+        print(f"Fehlerhafte Antworten: {len(errors)} (Statuscodes: {sorted(set(errors))})")
+
+    return {
+        "requests_per_second": num_requests / elapsed,
+        "logs_per_second": num_requests * logs_per_request / elapsed,
+        "predict": percentiles(latencies),
+        "favicon": percentiles(favicon_latencies) if favicon_latencies else None,
+        "errors": len(errors),
+    }
+
+# uvicorn app:app mit zusätzlichen Umgebungsvariablen starten und warten, bis er antwortet
+def start_server(settings, base_url):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(urlsplit(base_url).port or 80), "--no-access-log"],
+        env=dict(os.environ, **settings),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server mit {settings} beendet (Exit-Code {server.returncode}).")
+        try:
+            if requests.get(f"{base_url}/favicon.ico", timeout=1).status_code == 200:
+                return server
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"Server mit {settings} antwortet nicht nach {SERVER_START_TIMEOUT}s.")
+
+# Jede Logging-Einstellung mit einem eigenen Serverprozess messen und gegenüberstellen
+def compare_logging(base_url, concurrency, num_requests, logs_per_request, cache_mode):
+    results = []
+    for name, settings in LOGGING_MODES:
+        print(f"[INFO] Server mit {name} ({', '.join(f'{key}={value}' for key, value in settings.items())})")
+        server = start_server(settings, base_url)
+        try:
+            results.append((name, run_load_test(base_url, concurrency, num_requests, logs_per_request, cache_mode)))
+        finally:
+            server.terminate()
+            server.wait()
+
+    baseline = results[0][1]["logs_per_second"]
+    print(f"Logging-Vergleich (--cache {cache_mode}, {logs_per_request} Logs je Anfrage):")
+    print(f"{'Einstellung':<16} {'Logs/s':>10} {'relativ':>8} {'p50 ms':>8} {'p99 ms':>8} {'Favicon p99':>12}")
+    for name, result in results:
+        favicon = f"{result['favicon']['p99']:.1f}" if result["favicon"] else "-"
+        print(
+            f"{name:<16} {result['logs_per_second']:>10,.0f} {result['logs_per_second'] / baseline:>8.2f} "
+            f"{result['predict']['p50']:>8.1f} {result['predict']['p99']:>8.1f} {favicon:>12}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lasttest für /predict-text.")
+    parser.add_argument("base_url", nargs="?", default=BASE_URL)
+    parser.add_argument("logs_per_request", nargs="?", type=int, default=LOGS_PER_REQUEST)
+    parser.add_argument("num_requests", nargs="?", type=int, default=NUM_REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--cache", choices=("unique", "repeat"), default="unique",
+                        help="unique: eindeutige Zeilen ohne Cache-Treffer, repeat: 500 Beispielzeilen wiederholen")
+    parser.add_argument("--compare-logging", action="store_true",
+                        help="Server selbst auf dem Port aus base_url mit jeder Logging-Einstellung starten")
+    args = parser.parse_args()
+
+    if args.compare_logging:
+        compare_logging(args.base_url, args.concurrency, args.num_requests, args.logs_per_request, args.cache)
+    else:
+        run_load_test(args.base_url, args.concurrency, args.num_requests, args.logs_per_request, args.cache)
@@ -0,0 +1,12 @@
+# File: log_analysis/__init__.py
+
+# Parsing, Feature-Engineering und Anomalie-Detektoren für die Log-Analyse.
+# Das Paket führt beim Import keine Arbeit aus; TensorFlow, scikit-learn und
+# matplotlib werden erst in den Funktionen importiert, die sie benötigen:
+#   log_analysis.timestamps  Zeitstempel dekodieren
+#   log_analysis.parsing     Log-Zeilen parsen und als DataFrames einlesen
+#   log_analysis.features    Features und dateiweite Kennzahlen
+#   log_analysis.detectors   Isolation Forest, DBSCAN und Autoencoder
+#   log_analysis.models      Gespeicherte Detektoren (trainieren, laden, bewerten)
+#   log_analysis.results     Ausgabeordner und JSON-Lines-Ergebnisse
+#   log_analysis.plots       Visualisierungen (matplotlib/seaborn)
@@ -0,0 +1,200 @@
+# File: log_analysis/detectors.py
+
+import time
+import numpy as np
+from .features import select_features
+
+# TensorFlow und scikit-learn werden erst beim Anpassen bzw. Bewerten importiert
+
+# Autoencoder-Training: standardmäßig wie bisher 50 Epochen mit Batch 32. Der schnelle
+# Modus (AUTOENCODER_FAST = True) trainiert mit großen Batches und Early Stopping auf dem
+# Validierungsverlust; das ist deutlich schneller, ergibt aber ein anderes Modell und
+# damit andere Anomalien. Mit AUTOENCODER_WARM_START (nur im schnellen Modus) beginnt das
+# Training mit den Gewichten des gespeicherten Autoencoders desselben Log-Typs
+# (detector_models.py). Die Startwerte hängen damit nur vom Log-Typ ab, nicht von der
+# Reihenfolge der Dateien oder vom Worker-Prozess.
+AUTOENCODER_FAST = False
+AUTOENCODER_EPOCHS = 50  # im schnellen Modus Obergrenze, Early Stopping bricht meist früher ab
+AUTOENCODER_BATCH_SIZE = 1024
+AUTOENCODER_PATIENCE = 3  # Epochen ohne Verbesserung des Validierungsverlusts
+AUTOENCODER_WARM_START = False
+
+# DBSCAN-Parameter; im skalierbaren Modus werden identische Feature-Vektoren über
+# Gewichte zusammengefasst (gleiches Ergebnis wie DBSCAN auf allen Zeilen).
+# DBSCAN_MAX_FIT_ROWS (Standard None = exakt) begrenzt zusätzlich die Zahl der angepassten
+# Vektoren über eine Stichprobe mit Seed DBSCAN_SAMPLE_SEED; das ist eine Näherung.
+DBSCAN_EPS = 0.5
+DBSCAN_MIN_SAMPLES = 5
+DBSCAN_SCALABLE = True
+DBSCAN_ALGORITHM = "kd_tree"
+DBSCAN_MAX_FIT_ROWS = None
+DBSCAN_SAMPLE_SEED = 42
+
+# Keras-Callback, der die Dauer jeder Trainings-Epoche in epoch_times festhält
+def epoch_timer():
+    from tensorflow.keras.callbacks import LambdaCallback  # type: ignore
+
+    epoch_times = []
+    epoch_start = {}
+    callback = LambdaCallback(
+        on_epoch_begin=lambda epoch, logs: epoch_start.update(time=time.perf_counter()),
+        on_epoch_end=lambda epoch, logs: epoch_times.append(time.perf_counter() - epoch_start["time"]),
+    )
+    return callback, epoch_times
+
+# Autoencoder aufbauen und trainieren; initial_weights (Liste wie get_weights()) dienen
+# im schnellen Modus als Startwerte, wenn ihre Form zum Netz passt
+def train_autoencoder(features_scaled, initial_weights=None):
+    from tensorflow.keras.models import Sequential  # type: ignore
+    from tensorflow.keras.layers import Dense  # type: ignore
+    from tensorflow.keras.callbacks import EarlyStopping  # type: ignore
+    from sklearn.model_selection import train_test_split
+
+    input_dim = features_scaled.shape[1]
+    autoencoder = Sequential([
+        Dense(16, activation='relu', input_dim=input_dim),
+        Dense(8, activation='relu'),
+        Dense(16, activation='relu'),
+        Dense(input_dim, activation='sigmoid')
+    ])
+
+    autoencoder.compile(optimizer='adam', loss='mse')
+
+    timer, epoch_times = epoch_timer()
+    callbacks = [timer]
+    batch_size = 32
+    warm_start = False
+    if AUTOENCODER_FAST:
+        batch_size = AUTOENCODER_BATCH_SIZE
+        callbacks.append(EarlyStopping(monitor="val_loss", patience=AUTOENCODER_PATIENCE, restore_best_weights=True))
+        shapes = [weights.shape for weights in autoencoder.get_weights()]
+        if initial_weights is not None and [weights.shape for weights in initial_weights] == shapes:
+            autoencoder.set_weights(initial_weights)
+            warm_start = True
+
+    # Train/Test-Split
+    X_train, X_test = train_test_split(features_scaled, test_size=0.2, random_state=42)
+    autoencoder.fit(X_train, X_train, epochs=AUTOENCODER_EPOCHS, batch_size=batch_size, validation_data=(X_test, X_test), callbacks=callbacks)
+
+    epochs = len(epoch_times)
+    total = sum(epoch_times)
+    print(
+        f"Autoencoder: {epochs} Epochen in {total:.1f}s ({total / max(epochs, 1):.2f}s/Epoche, "
+        f"Batch {batch_size}{', Warmstart' if warm_start else ''})"
+    )
+    return autoencoder
+
+# Rekonstruktionsfehler berechnen
+def reconstruction_errors(autoencoder, features_scaled):
+    reconstruction_error = autoencoder.predict(features_scaled) - features_scaled
+    return (reconstruction_error ** 2).mean(axis=1)
+
+# DBSCAN-Labels für neue Punkte über den nächsten Kernpunkt (innerhalb eps) bestimmen
+def assign_dbscan_labels(dbscan, X):
+    labels = np.full(len(X), -1, dtype=int)
+    core_indices = dbscan.core_sample_indices_
+    if len(core_indices) == 0 or len(X) == 0:
+        return labels
+    from sklearn.neighbors import NearestNeighbors
+
+    neighbors = NearestNeighbors(n_neighbors=1, algorithm=DBSCAN_ALGORITHM).fit(dbscan.components_)
+    distances, indices = neighbors.kneighbors(X)
+    within_eps = distances[:, 0] <= dbscan.eps
+    labels[within_eps] = dbscan.labels_[core_indices][indices[within_eps, 0]]
+    return labels
+
+# DBSCAN anpassen, liefert (dbscan, Labels für alle Zeilen von X).
+# Im skalierbaren Modus wird jeder verschiedene Feature-Vektor nur einmal mit seiner
+# Häufigkeit als sample_weight angepasst, das ergibt dieselben Kernpunkte wie DBSCAN auf
+# allen Zeilen. Nur wenn DBSCAN_MAX_FIT_ROWS gesetzt ist und überschritten wird, wird auf
+# einer Zufallsstichprobe der Zeilen mit hochgerechneten Gewichten angepasst und der Rest
+# über den nächsten Kernpunkt zugeordnet (Näherung, mit Warnung). Die Cluster werden wie bei DBSCAN in der Reihenfolge
+# ihres ersten Kernpunkts in X nummeriert; Randpunkte mehrerer Cluster erhalten wie bei
+# DBSCAN das Cluster mit der kleinsten Nummer (das zuerst gefundene).
+def fit_dbscan(X):
+    from sklearn.cluster import DBSCAN
+
+    if not DBSCAN_SCALABLE:
+        dbscan = DBSCAN(eps=DBSCAN_EPS, min_samples=DBSCAN_MIN_SAMPLES)
+        return dbscan, dbscan.fit_predict(X)
+
+    X = np.asarray(X, dtype=float)
+    unique, first_index, inverse, counts = np.unique(X, axis=0, return_index=True, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    fit_rows = np.arange(len(unique))
+    weights = counts.astype(float)
+    if DBSCAN_MAX_FIT_ROWS is not None and len(unique) > DBSCAN_MAX_FIT_ROWS:
+        # Jede Zeile mit Wahrscheinlichkeit fraction ziehen, Gewichte auf alle Zeilen hochrechnen
+        fraction = DBSCAN_MAX_FIT_ROWS / len(unique)
+        print(
+            f"[WARNING] DBSCAN: {len(unique)} verschiedene Vektoren > DBSCAN_MAX_FIT_ROWS={DBSCAN_MAX_FIT_ROWS}, "
+            f"Anpassung auf einer Stichprobe ({fraction:.1%}, Seed {DBSCAN_SAMPLE_SEED}); Ergebnis ist eine Näherung."
+        )
+        sampled_counts = np.random.default_rng(DBSCAN_SAMPLE_SEED).binomial(counts, fraction)
+        fit_rows = np.flatnonzero(sampled_counts)
+        weights = sampled_counts[fit_rows] / fraction
+
+    dbscan = DBSCAN(eps=DBSCAN_EPS, min_samples=DBSCAN_MIN_SAMPLES, algorithm=DBSCAN_ALGORITHM)
+    dbscan.fit(unique[fit_rows], sample_weight=weights)
+
+    core_labels = dbscan.labels_[dbscan.core_sample_indices_]
+    if len(core_labels):
+        first_core_row = np.full(core_labels.max() + 1, len(X))
+        np.minimum.at(first_core_row, core_labels, first_index[fit_rows][dbscan.core_sample_indices_])
+        order = np.empty_like(first_core_row)
+        order[np.argsort(first_core_row, kind="stable")] = np.arange(len(first_core_row))
+        dbscan.labels_ = np.where(dbscan.labels_ >= 0, order[dbscan.labels_], -1)
+
+    if len(fit_rows) == len(unique):
+        unique_labels = dbscan.labels_
+        border = unique_labels >= 0
+        border[dbscan.core_sample_indices_] = False
+        if border.any():
+            from sklearn.neighbors import NearestNeighbors
+
+            neighbors = NearestNeighbors(radius=dbscan.eps, algorithm=DBSCAN_ALGORITHM).fit(dbscan.components_)
+            neighborhoods = neighbors.radius_neighbors(unique[border], return_distance=False)
+            core_labels = unique_labels[dbscan.core_sample_indices_]
+            unique_labels[border] = [core_labels[indices].min() for indices in neighborhoods]
+    else:
+        unique_labels = assign_dbscan_labels(dbscan, unique)
+    return dbscan, unique_labels[inverse]
+
+# Detektoren auf der skalierten Stichprobe trainieren
+def fit_detectors(scaler, sample_scaled, autoencoder_weights=None):
+    from sklearn.ensemble import IsolationForest
+
+    iso_forest = IsolationForest(contamination=0.05, random_state=42)
+    iso_forest.fit(sample_scaled)
+
+    dbscan, _ = fit_dbscan(sample_scaled)
+
+    autoencoder = train_autoencoder(sample_scaled, autoencoder_weights)
+    threshold = np.percentile(reconstruction_errors(autoencoder, sample_scaled), 95)  # 95. Perzentil als Schwelle
+
+    return {
+        "scaler": scaler,
+        "iso_forest": iso_forest,
+        "dbscan": dbscan,
+        "autoencoder": autoencoder,
+        "threshold": threshold,
+    }
+
+# Feature-Chunks mit bereits angepassten Detektoren bewerten (nur transform/predict),
+# liefert je Chunk (Chunk, Rekonstruktionsfehler, Anomalien je Detektor)
+def score_feature_chunks(feature_chunks, log_type, models):
+    for chunk in feature_chunks:
+        features_scaled = models["scaler"].transform(select_features(chunk, log_type))
+
+        chunk["anomaly_score"] = models["iso_forest"].predict(features_scaled)
+        chunk["decision_score"] = models["iso_forest"].decision_function(features_scaled)
+        chunk["dbscan_cluster"] = assign_dbscan_labels(models["dbscan"], features_scaled)
+        reconstruction_error = reconstruction_errors(models["autoencoder"], features_scaled)
+
+        anomalies = {
+            "isolation_forest": chunk[chunk["anomaly_score"] == -1],
+            "dbscan": chunk[chunk["dbscan_cluster"] == -1],
+            "autoencoder": chunk[reconstruction_error > models["threshold"]],
+        }
+        yield chunk, reconstruction_error, anomalies
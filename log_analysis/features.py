@@ -0,0 +1,122 @@
+# File: log_analysis/features.py
+
+import os
+from collections import Counter
+import numpy as np
+import pandas as pd
+from .parsing import iter_parsed_lines, iter_log_chunks, read_log_file
+
+# scikit-learn wird erst in den Funktionen importiert, die es benötigen
+
+SAMPLE_SIZE = 100000  # Zeilen, auf denen die Detektoren im Streaming-Modus trainiert werden
+
+FEATURE_COLUMNS = {
+    "error": ["pid", "message_length"],
+    "access": ["ip_count", "status_code_encoded", "user_agent_length", "time_diff", "is_suspicious_path"],
+    "myfiles": ["ip_count", "status_code_encoded", "user_agent_length", "time_diff", "is_suspicious_path"],
+}
+
+# Funktion zur Verarbeitung einer einzelnen Log-Datei
+def process_log_file(log_file, log_type):
+    df = read_log_file(log_file, log_type)
+    return df.rename(columns={"status": "status_code"})
+
+# Log-Datei in DataFrames mit höchstens chunk_size Zeilen einlesen
+def process_log_file_chunked(log_file, log_type, chunk_size):
+    for chunk in iter_log_chunks(log_file, log_type, chunk_size):
+        yield chunk.rename(columns={"status": "status_code"})
+
+# Dateiweite Kennzahlen sammeln, die extract_features für einzelne Chunks benötigt
+def collect_feature_stats(log_file, log_type):
+    rows = 0
+    ip_counts = Counter()
+    status_codes = set()
+    for entry in iter_parsed_lines(log_file, log_type, raw_timestamps=True):
+        rows += 1
+        if log_type != "error":
+            ip_counts[entry["ip"]] += 1
+            status_codes.add(entry["status"])
+    return {"rows": rows, "ip_counts": ip_counts, "status_codes": sorted(status_codes)}
+
+# Funktion zum Extrahieren von zusätzlichen Features
+# Mit stats (aus collect_feature_stats) liefern aufeinanderfolgende Chunks dieselben
+# Werte wie ein Aufruf auf der ganzen Datei; stats merkt sich dazu den letzten Zeitstempel.
+def extract_features(df, log_type, stats=None):
+    if log_type == "access" or log_type == "myfiles":
+        if stats is None:
+            df["ip_count"] = df["ip"].map(df["ip"].value_counts())
+        else:
+            df["ip_count"] = df["ip"].map(stats["ip_counts"])
+        df["user_agent_length"] = df["user_agent"].str.len()
+        time_diff = df["timestamp"].diff()
+        if stats is not None and "last_timestamp" in stats:
+            time_diff.iloc[0] = df["timestamp"].iloc[0] - stats["last_timestamp"]
+        df["time_diff"] = time_diff.dt.total_seconds().fillna(0)
+        df["is_suspicious_path"] = df["url"].str.contains(r"(../|.env|.git/config)", regex=True).astype(int)
+        df["status_code"] = df["status_code"].astype(str)
+
+        # Label-Encoding für kategoriale Features
+        if stats is None:
+            from sklearn.preprocessing import LabelEncoder
+            status_encoder = LabelEncoder()
+            df["status_code_encoded"] = status_encoder.fit_transform(df["status_code"])
+        else:
+            # Entspricht LabelEncoder auf der ganzen Datei; unbekannte Statuscodes
+            # (Follow-Modus) erhalten ihre Sortierposition unter den bekannten Codes
+            status_classes = np.array(stats["status_codes"], dtype=str)
+            df["status_code_encoded"] = np.searchsorted(status_classes, df["status_code"].to_numpy(dtype=str))
+            stats["last_timestamp"] = df["timestamp"].iloc[-1]
+
+    elif log_type == "error":
+        df["pid"] = df["pid"].astype(int)
+        df["message_length"] = df["message"].str.len()
+
+    return df
+
+# Log-Typ anhand des Dateinamens bestimmen
+def get_log_type(log_file):
+    if "myfiles" in os.path.basename(log_file):
+        return "myfiles"
+    elif "access" in os.path.basename(log_file):
+        return "access"
+    elif "error" in os.path.basename(log_file):
+        return "error"
+    return "unknown"
+
+def select_features(df, log_type):
+    return df[FEATURE_COLUMNS.get(log_type, FEATURE_COLUMNS["access"])]
+
+# Gleichverteilte Stichprobe über alle Chunks (Bottom-k nach Zufallsschlüssel)
+def update_sample(sample, chunk, sample_size, rng):
+    chunk = chunk.assign(_sample_key=rng.random(len(chunk)))
+    if sample is not None:
+        chunk = pd.concat([sample, chunk], ignore_index=True)
+    if len(chunk) <= sample_size:
+        return chunk
+    return chunk.nsmallest(sample_size, "_sample_key").reset_index(drop=True)
+
+# Chunks einer Datei einlesen und mit den dateiweiten Kennzahlen in Features umwandeln
+def iter_feature_chunks(log_file, log_type, stats, chunk_size):
+    chunk_stats = dict(stats)
+    for chunk in process_log_file_chunked(log_file, log_type, chunk_size):
+        yield extract_features(chunk, log_type, chunk_stats)
+
+# Scaler inkrementell über alle Feature-Chunks anpassen und eine Stichprobe ziehen
+def fit_scaler_and_sample(feature_chunks, log_type, sample_size=SAMPLE_SIZE):
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    rng = np.random.default_rng(42)
+    sample = None
+    for chunk in feature_chunks:
+        scaler.partial_fit(select_features(chunk, log_type))
+        sample = update_sample(sample, chunk, sample_size, rng)
+    return scaler, sample.drop(columns="_sample_key")
+
+# Chunk an eine JSON-Lines-Datei anhängen
+def append_json_lines(df, path):
+    if df.empty:
+        return
+    text = df.to_json(orient="records", lines=True)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(text if text.endswith("\n") else text + "\n")
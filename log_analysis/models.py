@@ -0,0 +1,170 @@
+# File: log_analysis/models.py
+
+import os
+import json
+from datetime import datetime
+import joblib
+from .parsing import DEFAULT_CHUNK_SIZE
+from .features import (
+    FEATURE_COLUMNS, SAMPLE_SIZE, collect_feature_stats, extract_features,
+    iter_feature_chunks, fit_scaler_and_sample, select_features, append_json_lines,
+)
+from .detectors import fit_detectors, score_feature_chunks
+from .results import prepare_anomaly_outputs
+
+# Gespeicherte Detektoren: einmal auf einem Basisdatensatz anpassen, danach
+# neue Dateien nur noch mit transform/predict bewerten. Jede Version liegt unter
+# models/<Log-Typ>/<Version>/, die Datei LATEST verweist auf die aktuelle Version.
+MODEL_FOLDER = "models"
+CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+LATEST_FILE = "LATEST"
+DETECTORS_FILE = "detectors.joblib"
+AUTOENCODER_FILE = "autoencoder.keras"
+METADATA_FILE = "metadata.json"
+
+def model_version_folder(log_type, version, model_folder=MODEL_FOLDER):
+    return os.path.join(model_folder, log_type, version)
+
+# Version, auf die LATEST verweist, oder None, wenn noch nichts trainiert wurde
+def latest_version(log_type, model_folder=MODEL_FOLDER):
+    try:
+        with open(os.path.join(model_folder, log_type, LATEST_FILE), "r") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+# Neuen Versionsordner anlegen; Mikrosekunden im Namen, bei einer Kollision erneut versuchen
+def create_version_folder(log_type, model_folder=MODEL_FOLDER):
+    os.makedirs(os.path.join(model_folder, log_type), exist_ok=True)
+    while True:
+        version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        folder = model_version_folder(log_type, version, model_folder)
+        try:
+            os.mkdir(folder)
+            return version, folder
+        except FileExistsError:
+            continue
+
+# Detektoren für einen Log-Typ auf den Basisdateien anpassen. Die Statuscodes aller
+# Basisdateien bilden eine gemeinsame Kodierung, damit die Features dateiübergreifend
+# vergleichbar sind; IP-Häufigkeiten und Zeitabstände bleiben dateiweit.
+def train_models(log_files, log_type, chunk_size=CHUNK_SIZE, sample_size=SAMPLE_SIZE):
+    file_stats = [(log_file, collect_feature_stats(log_file, log_type)) for log_file in log_files]
+    file_stats = [(log_file, stats) for log_file, stats in file_stats if stats["rows"] > 0]
+    if not file_stats:
+        return None
+
+    status_codes = sorted({code for _, stats in file_stats for code in stats["status_codes"]})
+
+    def baseline_chunks():
+        for log_file, stats in file_stats:
+            yield from iter_feature_chunks(log_file, log_type, dict(stats, status_codes=status_codes), chunk_size)
+
+    import sklearn
+
+    scaler, sample = fit_scaler_and_sample(baseline_chunks(), log_type, sample_size)
+    models = fit_detectors(scaler, scaler.transform(select_features(sample, log_type)))
+    models["status_codes"] = status_codes
+    models["metadata"] = {
+        "log_type": log_type,
+        "feature_columns": FEATURE_COLUMNS[log_type],
+        "training_files": [log_file for log_file, _ in file_stats],
+        "training_rows": sum(stats["rows"] for _, stats in file_stats),
+        "sample_rows": len(sample),
+        "sklearn_version": sklearn.__version__,
+    }
+    return models
+
+# Detektoren als neue Version speichern und LATEST erst danach umstellen,
+# damit parallel laufende Bewertungen nie eine halb geschriebene Version laden
+def save_models(models, log_type, model_folder=MODEL_FOLDER):
+    version, folder = create_version_folder(log_type, model_folder)
+
+    joblib.dump(
+        {name: models[name] for name in ("scaler", "iso_forest", "dbscan", "threshold", "status_codes")},
+        os.path.join(folder, DETECTORS_FILE),
+    )
+    models["autoencoder"].save(os.path.join(folder, AUTOENCODER_FILE))
+    metadata = dict(models["metadata"], version=version, created=datetime.now().isoformat(timespec="seconds"))
+    with open(os.path.join(folder, METADATA_FILE), "w", encoding="utf-8") as file:
+        json.dump(metadata, file, indent=2)
+
+    latest_path = os.path.join(model_folder, log_type, LATEST_FILE)
+    tmp_path = f"{latest_path}.{version}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(version + "\n")
+    os.replace(tmp_path, latest_path)
+    return version
+
+# Gespeicherte Detektoren laden (ohne version die aktuelle), None falls keine vorhanden.
+# Ohne Autoencoder genügt scikit-learn, z. B. für den Follow-Modus.
+def load_models(log_type, version=None, model_folder=MODEL_FOLDER, load_autoencoder=True):
+    version = version or latest_version(log_type, model_folder)
+    if version is None:
+        return None
+    folder = model_version_folder(log_type, version, model_folder)
+
+    models = joblib.load(os.path.join(folder, DETECTORS_FILE))
+    with open(os.path.join(folder, METADATA_FILE), "r", encoding="utf-8") as file:
+        models["metadata"] = json.load(file)
+    if models["metadata"]["feature_columns"] != FEATURE_COLUMNS[log_type]:
+        raise ValueError(f"Modell {version} ({log_type}) wurde mit anderen Features trainiert.")
+    if load_autoencoder:
+        from tensorflow.keras.models import load_model  # type: ignore
+        models["autoencoder"] = load_model(os.path.join(folder, AUTOENCODER_FILE))
+    models["version"] = version
+    return models
+
+# Gewichte des gespeicherten Autoencoders eines Log-Typs als Startwerte für den
+# Warmstart (siehe detectors.AUTOENCODER_WARM_START); None ohne passendes Modell
+def saved_autoencoder_weights(log_type, model_folder=MODEL_FOLDER):
+    version = latest_version(log_type, model_folder)
+    if version is None:
+        return None
+    folder = model_version_folder(log_type, version, model_folder)
+    with open(os.path.join(folder, METADATA_FILE), "r", encoding="utf-8") as file:
+        if json.load(file)["feature_columns"] != FEATURE_COLUMNS[log_type]:
+            return None
+    from tensorflow.keras.models import load_model  # type: ignore
+    return load_model(os.path.join(folder, AUTOENCODER_FILE)).get_weights()
+
+# Feature-Kennzahlen einer Datei mit der Statuscode-Kodierung des Modells
+def model_feature_stats(log_file, log_type, models):
+    stats = collect_feature_stats(log_file, log_type)
+    stats["status_codes"] = models["status_codes"]
+    return stats
+
+# Bereits eingelesenen DataFrame mit gespeicherten Detektoren bewerten (nur Isolation Forest)
+def score_frame(df, log_type, models):
+    stats = {"status_codes": models["status_codes"]}
+    if log_type != "error":
+        stats["ip_counts"] = df["ip"].value_counts()
+    df = extract_features(df, log_type, stats)
+    features_scaled = models["scaler"].transform(select_features(df, log_type))
+    df["anomaly_score"] = models["iso_forest"].predict(features_scaled)
+    df["decision_score"] = models["iso_forest"].decision_function(features_scaled)
+    return df
+
+# Eine Log-Datei in Chunks mit gespeicherten Detektoren bewerten,
+# liefert dieselbe Zusammenfassung wie analyse_log_file
+def score_log_file(log_file, log_type, models, chunk_size=CHUNK_SIZE):
+    stats = model_feature_stats(log_file, log_type, models)
+
+    if stats["rows"] == 0:
+        print(f"Datei {log_file} ist leer oder enthält ungültige Daten.")
+        return
+
+    output_folder, log_file_name, output_paths = prepare_anomaly_outputs(log_file)
+    counts = {name: 0 for name in output_paths}
+    feature_chunks = iter_feature_chunks(log_file, log_type, stats, chunk_size)
+    for _, _, anomalies in score_feature_chunks(feature_chunks, log_type, models):
+        for name, anomaly_df in anomalies.items():
+            counts[name] += len(anomaly_df)
+            append_json_lines(anomaly_df, output_paths[name])
+
+    print(f"Anzahl der Anomalien in {log_file} (Isolation Forest): {counts['isolation_forest']}")
+    print(f"Anzahl der Anomalien in {log_file} (DBSCAN): {counts['dbscan']}")
+    print(f"Anzahl der Anomalien in {log_file} (Autoencoder): {counts['autoencoder']}")
+    print(f"Anomalien gespeichert in: {output_folder} (Modell {models['version']})")
+
+    return dict(counts, rows=stats["rows"], output_folder=output_folder)
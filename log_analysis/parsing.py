@@ -0,0 +1,146 @@
+# File: log_analysis/parsing.py
+
+import os
+import re
+from itertools import islice
+import pandas as pd
+from .timestamps import ACCESS_TIME_FORMAT, ERROR_TIME_FORMAT, decode_timestamp, to_datetime_column
+
+# Regex-Muster werden einmalig beim Import kompiliert
+ACCESS_PATTERN = re.compile(
+    r'(?P<ip>\S+) - - \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
+)
+ERROR_PATTERN = re.compile(
+    r'(?P<timestamp>\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(?P<severity>error)] (?P<module>[^:]+): \*(?P<pid>\d+) (?P<message>.+), client: (?P<client>[^,]+), server: (?P<server>[^,]+), request: \"(?P<request>[^\"]+)\", host: \"(?P<host>[^\"]+)\"'
+)
+MYFILES_PATTERN = re.compile(
+    r'(?P<ip>\S+) - (?P<user>\S+) \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
+)
+
+TIME_FORMATS = {
+    "access": ACCESS_TIME_FORMAT,
+    "error": ERROR_TIME_FORMAT,
+    "myfiles": ACCESS_TIME_FORMAT,
+}
+
+# Zeitstempel umwandeln, ungültige Werte werden zu None (wie errors="coerce")
+def parse_timestamp(value, time_format):
+    return decode_timestamp(value, time_format)
+
+# Zeilen zerlegen, der Zeitstempel bleibt als Text erhalten
+def match_access_log(line):
+    match = ACCESS_PATTERN.match(line)
+    if not match:
+        return None
+    data = match.groupdict()
+    data["size"] = None if data["size"] == "-" else int(data["size"])
+    return data
+
+def match_error_log(line):
+    match = ERROR_PATTERN.match(line)
+    if not match:
+        return None
+    return match.groupdict()
+
+def match_myfiles_log(line):
+    match = MYFILES_PATTERN.match(line)
+    if not match:
+        return None
+    data = match.groupdict()
+    data["size"] = None if data["size"] == "-" else int(data["size"])
+    return data
+
+# Log-Parsing-Funktionen
+def parse_access_log(line):
+    data = match_access_log(line)
+    if data:
+        data["timestamp"] = parse_timestamp(data["timestamp"], ACCESS_TIME_FORMAT)
+    return data
+
+def parse_error_log(line):
+    data = match_error_log(line)
+    if data:
+        data["timestamp"] = parse_timestamp(data["timestamp"], ERROR_TIME_FORMAT)
+    return data
+
+def parse_myfiles_log(line):
+    data = match_myfiles_log(line)
+    if data:
+        data["timestamp"] = parse_timestamp(data["timestamp"], ACCESS_TIME_FORMAT)
+    return data
+
+PARSERS = {
+    "access": parse_access_log,
+    "error": parse_error_log,
+    "myfiles": parse_myfiles_log,
+}
+
+RAW_PARSERS = {
+    "access": match_access_log,
+    "error": match_error_log,
+    "myfiles": match_myfiles_log,
+}
+
+# Zeilen einer Log-Datei parsen, ungültige Zeilen werden übersprungen.
+# Mit raw_timestamps=True bleibt der Zeitstempel Text (siehe build_log_frame).
+def iter_parsed_lines(log_file, log_type, raw_timestamps=False):
+    parser = (RAW_PARSERS if raw_timestamps else PARSERS).get(log_type)
+    if parser is None:
+        return
+    log_file_name = os.path.basename(log_file)
+    with open(log_file, "r") as file:
+        for line in file:
+            entry = parser(line)
+            if entry:
+                entry["log_file"] = log_file_name
+                yield entry
+
+# DataFrame aus Einträgen mit Text-Zeitstempeln bauen, die Zeitstempel-Spalte
+# wird dabei in einem Schritt umgewandelt (wall_clock: siehe to_datetime_column)
+def build_log_frame(entries, log_type, wall_clock=False):
+    df = pd.DataFrame(entries)
+    if not df.empty:
+        df["timestamp"] = to_datetime_column(df["timestamp"], TIME_FORMATS[log_type], wall_clock)
+    return df
+
+# Ganze Log-Datei als DataFrame einlesen
+def read_log_file(log_file, log_type, wall_clock=False):
+    return build_log_frame(iter_parsed_lines(log_file, log_type, raw_timestamps=True), log_type, wall_clock)
+
+# Standardgröße der DataFrame-Chunks beim Streaming
+DEFAULT_CHUNK_SIZE = 100000
+
+# Log-Datei als Folge von DataFrames mit höchstens chunk_size Zeilen einlesen
+def iter_log_chunks(log_file, log_type, chunk_size=DEFAULT_CHUNK_SIZE, wall_clock=False):
+    entries = iter_parsed_lines(log_file, log_type, raw_timestamps=True)
+    while True:
+        chunk = list(islice(entries, chunk_size))
+        if not chunk:
+            return
+        yield build_log_frame(chunk, log_type, wall_clock)
+
+# Log-Datei ab einem Byte-Offset lesen, liefert (DataFrame, End-Offset) je Chunk.
+# Der End-Offset zeigt hinter die letzte verarbeitete Zeile. Eine letzte Zeile ohne
+# Zeilenumbruch wird nur übernommen, wenn sie vollständig geparst werden kann,
+# sonst wird sie als noch unvollständig geschrieben beim nächsten Lauf erneut gelesen.
+def iter_log_chunks_from_offset(log_file, log_type, offset=0, chunk_size=DEFAULT_CHUNK_SIZE, wall_clock=False):
+    parser = RAW_PARSERS.get(log_type)
+    if parser is None:
+        return
+    log_file_name = os.path.basename(log_file)
+    chunk = []
+    with open(log_file, "rb") as file:
+        file.seek(offset)
+        for raw_line in file:
+            line = raw_line.decode("utf-8", errors="replace")
+            entry = parser(line)
+            if not raw_line.endswith(b"\n") and not entry:
+                break
+            offset += len(raw_line)
+            if entry:
+                entry["log_file"] = log_file_name
+                chunk.append(entry)
+                if len(chunk) >= chunk_size:
+                    yield build_log_frame(chunk, log_type, wall_clock), offset
+                    chunk = []
+    yield build_log_frame(chunk, log_type, wall_clock), offset
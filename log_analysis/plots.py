@@ -0,0 +1,62 @@
+# File: log_analysis/plots.py
+
+import os
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Visualisierungen
+def plot_reconstruction_errors(line_numbers, reconstruction_error, threshold, log_file, output_folder, log_file_name):
+    plt.figure(figsize=(12, 6))
+    plt.plot(line_numbers, reconstruction_error, label="Rekonstruktionsfehler")
+    plt.axhline(y=threshold, color='r', linestyle='--', label="Threshold")
+    plt.xlabel("Zeile im Log")
+    plt.ylabel("Rekonstruktionsfehler")
+    plt.title(f"Anomalien in {log_file} (Autoencoder)")
+    plt.legend()
+    plt.grid(True)
+    plt.savefig(os.path.join(output_folder, f"{log_file_name}_reconstruction_errors.png"))
+    plt.close()
+
+def plot_ip_activity(ip_activity, log_file, output_folder, log_file_name):
+    plt.figure(figsize=(12, 8))
+    sns.barplot(x=ip_activity.index[:20], y=ip_activity.values[:20], palette="coolwarm")
+    plt.xticks(rotation=90)
+    plt.title(f"Top 20 IP-Adressen nach Anzahl der Anfragen in {log_file}")
+    plt.xlabel("IP-Adresse")
+    plt.ylabel("Anfragen")
+    plt.grid(axis='y')
+    plt.savefig(os.path.join(output_folder, f"{log_file_name}_ip_activity.png"))
+    plt.close()
+
+def plot_error_anomalies(df, log_file, output_folder, log_file_name):
+    # Scatterplot für Error Logs
+    plt.figure(figsize=(10, 6))
+    plt.scatter(df["pid"], df["message_length"], c=(df["anomaly_score"] == -1), cmap="coolwarm", alpha=0.7)
+    plt.title(f"Anomalien in {log_file} (Error Logs)")
+    plt.xlabel("PID")
+    plt.ylabel("Länge der Fehlermeldung")
+    plt.grid(True)
+    plt.savefig(os.path.join(output_folder, f"{log_file_name}_error_anomalies.png"))
+    plt.close()
+
+def plot_time_error_anomalies(time_anomalies, log_file, output_folder, log_file_name):
+    # Fehlerhäufigkeit nach Zeit darstellen
+    plt.figure(figsize=(12, 6))
+    plt.bar(time_anomalies.index, time_anomalies.values, color="orange", alpha=0.7)
+    plt.title(f"Häufigkeit der Anomalien nach Stunden in {log_file}")
+    plt.xlabel("Stunde des Tages")
+    plt.ylabel("Anzahl der Anomalien")
+    plt.grid(axis='y')
+    plt.savefig(os.path.join(output_folder, f"{log_file_name}_time_error_anomalies.png"))
+    plt.close()
+
+def plot_access_anomalies(df, log_file, output_folder, log_file_name):
+    # Scatterplot für Access/MyFiles Logs
+    plt.figure(figsize=(10, 6))
+    plt.scatter(df["time_diff"], df["status_code_encoded"], c=(df["anomaly_score"] == -1), cmap="coolwarm", alpha=0.7)
+    plt.title(f"Anomalien in {log_file} (Access/MyFiles Logs)")
+    plt.xlabel("Zeitunterschied zwischen Anfragen (Sekunden)")
+    plt.ylabel("Status-Code (kodiert)")
+    plt.grid(True)
+    plt.savefig(os.path.join(output_folder, f"{log_file_name}_access_anomalies.png"))
+    plt.close()
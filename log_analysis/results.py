@@ -0,0 +1,23 @@
+# File: log_analysis/results.py
+
+import os
+
+# Ausgabeordner results/<Dateiname> anlegen
+def prepare_output_folder(log_file):
+    log_file_name = os.path.splitext(os.path.basename(log_file))[0]
+    output_folder = os.path.join("results", log_file_name)
+
+    # Erstelle den Ordner, falls er noch nicht existiert
+    os.makedirs(output_folder, exist_ok=True)
+    return output_folder, log_file_name
+
+# Ausgabeordner anlegen und leere JSON-Lines-Dateien für die Anomalien je Detektor vorbereiten
+def prepare_anomaly_outputs(log_file):
+    output_folder, log_file_name = prepare_output_folder(log_file)
+    output_paths = {
+        name: os.path.join(output_folder, f"{log_file_name}_anomalies_{name}.json")
+        for name in ("isolation_forest", "dbscan", "autoencoder")
+    }
+    for path in output_paths.values():
+        open(path, "w").close()
+    return output_folder, log_file_name, output_paths
@@ -0,0 +1,127 @@
+# File: log_analysis/timestamps.py
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+ACCESS_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+ERROR_TIME_FORMAT = "%Y/%m/%d %H:%M:%S"
+
+# Benachbarte Log-Zeilen teilen sich meist denselben Zeitstempel,
+# daher reicht ein kleiner Cache der zuletzt gesehenen Werte
+CACHE_SIZE = 4096
+
+# Ungültige Zeitstempel als int64 (entspricht NaT in NumPy/Pandas)
+INVALID_EPOCH = np.iinfo(np.int64).min
+
+MONTHS = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12,
+}
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+UNIX_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Zeitzonen-Objekte wiederverwenden
+@lru_cache(maxsize=64)
+def _timezone(offset):
+    sign = -1 if offset[0] == "-" else 1
+    delta = timedelta(hours=int(offset[1:3]), minutes=int(offset[3:5]))
+    return timezone.utc if not delta else timezone(sign * delta)
+
+# Fallback für Werte, die nicht dem festen Layout entsprechen
+def _strptime(value, time_format):
+    try:
+        return datetime.strptime(value, time_format)
+    except ValueError:
+        return None
+
+# "%d/%b/%Y:%H:%M:%S %z", z. B. "10/Oct/2000:13:55:36 -0700"
+@lru_cache(maxsize=CACHE_SIZE)
+def decode_access_timestamp(value):
+    month = MONTHS.get(value[3:6])
+    digits = value[0:2] + value[7:11] + value[12:14] + value[15:17] + value[18:20] + value[22:26]
+    if (
+        len(value) != 26 or month is None or not digits.isdecimal()
+        or value[2] != "/" or value[6] != "/" or value[11] != ":" or value[14] != ":"
+        or value[17] != ":" or value[20] != " " or value[21] not in "+-"
+    ):
+        return _strptime(value, ACCESS_TIME_FORMAT)
+    try:
+        return datetime(
+            int(value[7:11]), month, int(value[0:2]),
+            int(value[12:14]), int(value[15:17]), int(value[18:20]),
+            tzinfo=_timezone(value[21:26]),
+        )
+    except ValueError:
+        return None
+
+# "%Y/%m/%d %H:%M:%S", z. B. "2024/12/01 10:00:00"
+@lru_cache(maxsize=CACHE_SIZE)
+def decode_error_timestamp(value):
+    digits = value[0:4] + value[5:7] + value[8:10] + value[11:13] + value[14:16] + value[17:19]
+    if (
+        len(value) != 19 or not digits.isdecimal()
+        or value[4] != "/" or value[7] != "/" or value[10] != " " or value[13] != ":" or value[16] != ":"
+    ):
+        return _strptime(value, ERROR_TIME_FORMAT)
+    try:
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19]),
+        )
+    except ValueError:
+        return None
+
+DECODERS = {
+    ACCESS_TIME_FORMAT: decode_access_timestamp,
+    ERROR_TIME_FORMAT: decode_error_timestamp,
+}
+
+# Einzelnen Zeitstempel umwandeln, ungültige Werte werden zu None
+def decode_timestamp(value, time_format):
+    decoder = DECODERS.get(time_format)
+    if decoder is None:
+        return _strptime(value, time_format)
+    return decoder(value)
+
+# Sekunden seit 1970 (naive Werte werden als UTC interpretiert)
+def _epoch_seconds(timestamp):
+    if timestamp is None:
+        return INVALID_EPOCH
+    if timestamp.tzinfo is None:
+        return (timestamp - UNIX_EPOCH) // timedelta(seconds=1)
+    return (timestamp - UNIX_EPOCH_UTC) // timedelta(seconds=1)
+
+# Wie _epoch_seconds, aber mit der Ortszeit aus der Log-Zeile (Offset wird verworfen)
+def _wall_clock_seconds(timestamp):
+    if timestamp is None:
+        return INVALID_EPOCH
+    return (timestamp.replace(tzinfo=None) - UNIX_EPOCH) // timedelta(seconds=1)
+
+# Ganze Spalte in int64-Epoch-Sekunden umwandeln: jeder verschiedene Wert
+# wird nur einmal dekodiert, ungültige Werte ergeben INVALID_EPOCH.
+# Mit wall_clock=True zählt die Ortszeit der Zeile statt des UTC-Zeitpunkts.
+def to_epoch_seconds(values, time_format, wall_clock=False):
+    seconds = _wall_clock_seconds if wall_clock else _epoch_seconds
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=True)
+    decoded = np.fromiter(
+        (seconds(decode_timestamp(value, time_format)) for value in uniques),
+        dtype=np.int64,
+        count=len(uniques),
+    )
+    epochs = np.full(len(codes), INVALID_EPOCH, dtype=np.int64)
+    valid = codes >= 0
+    epochs[valid] = decoded[codes[valid]]
+    return epochs
+
+# Spalte als datetime64 (mit %z in UTC, sonst ohne Zeitzone) zurückgeben.
+# wall_clock=True liefert stattdessen die Ortszeit aus der Zeile ohne Zeitzone, so wie
+# sie der MySQL-Import (DATETIME-Spalten) schon immer gespeichert hat.
+def to_datetime_column(values, time_format, wall_clock=False):
+    epochs = to_epoch_seconds(values, time_format, wall_clock)
+    column = pd.Series(epochs.astype("datetime64[s]"), index=getattr(values, "index", None))
+    if "%z" in time_format and not wall_clock:
+        column = column.dt.tz_localize("UTC")
+    return column
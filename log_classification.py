@@ -1,12 +1,14 @@
 # file: log_classification.py
 
+import os
 import pandas as pd
 from sklearn.model_selection import train_test_split, cross_val_score
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, accuracy_score
 import joblib
-import re
+from log_preprocessing import TEXT_PIPELINE_PATH, HASHING_FEATURES, build_text_pipeline, build_vectorizer
+from text_model_store import save_text_model
+from forest_arrays import export_forest, save_array_forest
 
 # Pfade zu den Dateien
 normal_logs_path = "myfiles-access_anon.log"
@@ -14,15 +16,10 @@ bad_logs_path = "malicious_myfiles_20241214143634.log"
 
 # Variablen zur Steuerung der Verarbeitung
 lines_to_read = 100000  # Anzahl der Zeilen, die pro Datei gelesen werden
-
-# Funktion zur Vorverarbeitung der Logs
-def preprocess_logs(logs):
-    logs["log"] = logs["log"].apply(lambda x: re.sub(r'\d+\.\d+\.\d+\.\d+', 'IP', x))  # IP-Adressen maskieren
-    logs["log"] = logs["log"].apply(lambda x: re.sub(r'\[[^\]]+\]', 'TIMESTAMP', x))  # Zeitstempel maskieren
-    logs["log"] = logs["log"].apply(lambda x: re.sub(r'"([^"]+)"', r'"\1"', x))  # Request unberührt lassen
-    logs["log"] = logs["log"].apply(lambda x: re.sub(r'[^\w\s/?.=&]', '', x))  # Entferne irrelevante Sonderzeichen
-    logs["log"] = logs["log"].apply(lambda x: x.lower())  # Normalisierung
-    return logs
+# Merkmale: "tfidf" (Vokabular) oder "hashing" (gehashte n-Gramme, IDF optional mit HASHING_IDF=1)
+feature_mode = os.getenv("FEATURE_MODE", "tfidf")
+hashing_idf = os.getenv("HASHING_IDF", "1") == "1"
+hashing_features = int(os.getenv("HASHING_FEATURES", str(HASHING_FEATURES)))
 
 # Funktion zum Lesen einer Log-Datei
 def read_logs(file_path, num_lines, label):
@@ -39,14 +36,12 @@ bad_logs = read_logs(bad_logs_path, lines_to_read, 1)
 print("[INFO] Kombinieren der Daten...")
 data = pd.concat([normal_logs, bad_logs]).sample(frac=1).reset_index(drop=True)
 
-# Vorverarbeitung der Logs
-print("[INFO] Vorverarbeitung der Logs...")
-data = preprocess_logs(data)
-
-# Feature-Extraktion mit TF-IDF
-print("[INFO] Extrahieren der Merkmale mit TF-IDF...")
-vectorizer = TfidfVectorizer(max_features=10000, ngram_range=(2, 3), stop_words='english', max_df=0.95, min_df=5)
-X = vectorizer.fit_transform(data["log"])
+# Vorverarbeitung (log_preprocessing.py) und Feature-Extraktion als eine Pipeline,
+# die unverändert auch für die Vorhersage verwendet wird
+print(f"[INFO] Vorverarbeitung der Logs und Extrahieren der Merkmale ({feature_mode})...")
+vectorizer = build_vectorizer(feature_mode, idf=hashing_idf, n_features=hashing_features)
+text_pipeline = build_text_pipeline(vectorizer)
+X = text_pipeline.fit_transform(data["log"])
 y = data["label"]
 
 # Daten in Trainings- und Testdaten aufteilen
@@ -69,8 +64,20 @@ scores = cross_val_score(model, X, y, cv=5, scoring='accuracy')
 print(f"Cross-Validation Accuracy: {scores.mean():.4f} ± {scores.std():.4f}")
 
 # Modell speichern
-print("[INFO] Speichern des Modells und des Vektorisierers...")
+print("[INFO] Speichern des Modells und der Vorverarbeitungs-Pipeline...")
 joblib.dump(model, "log_classifier.pkl")
-joblib.dump(vectorizer, "log_vectorizer.pkl")
+joblib.dump(text_pipeline, TEXT_PIPELINE_PATH)
+# Bäume als flache NumPy-Arrays für das Backend "arrays" (forest_arrays.py)
+save_array_forest(export_forest(model))
+
+# Zusätzlich als Version unter models/text_classifier (für Memory-Mapping und Neuladen im Server)
+version = save_text_model(model, text_pipeline, {
+    "feature_mode": feature_mode,
+    "hashing_idf": hashing_idf if feature_mode == "hashing" else None,
+    "hashing_features": hashing_features if feature_mode == "hashing" else None,
+    "training_rows": len(data),
+    "test_accuracy": round(float(accuracy_score(y_test, y_pred)), 4),
+})
+print(f"[INFO] Modellversion {version} gespeichert.")
 
-print("[INFO] Fertig. Modell und Vektorisierer wurden gespeichert.")
+print("[INFO] Fertig. Modell und Pipeline wurden gespeichert.")
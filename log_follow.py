@@ -0,0 +1,261 @@
+# File: log_follow.py
+
+import os
+import sys
+import time
+import logging
+from collections import Counter
+import pandas as pd
+from log_analysis.parsing import RAW_PARSERS, build_log_frame, iter_log_chunks_from_offset
+from log_analysis.features import (
+    collect_feature_stats, extract_features, fit_scaler_and_sample, get_log_type,
+    select_features, append_json_lines,
+)
+from log_analysis.models import load_models
+
+# Follow-Modus: Dateien in share_logs wie "tail -F" verfolgen und neue Zeilen
+# in Micro-Batches mit einem bereits angepassten Modell bewerten
+LOG_FOLDER = "share_logs"
+POLL_INTERVAL = 0.5  # Sekunden Pause, wenn keine neuen Zeilen vorliegen
+BATCH_LINES = 5000  # Maximale Anzahl Zeilen pro Micro-Batch
+REPORT_INTERVAL = 10  # Sekunden zwischen Statusmeldungen
+MIN_FIT_ROWS = 1000  # Mindestanzahl Zeilen, bevor ein Modell angepasst wird
+CHUNK_SIZE = 100000  # Chunk-Größe beim Einlesen der vorhandenen Historie
+ANOMALY_OUTPUT = os.path.join("results", "follow_anomalies.json")
+
+# Scaler und Isolation Forest auf bereits geparsten Chunks anpassen
+def fit_model(chunks, log_type, stats):
+    from sklearn.ensemble import IsolationForest
+
+    chunk_stats = dict(stats)
+    feature_chunks = (extract_features(chunk, log_type, chunk_stats) for chunk in chunks)
+    scaler, sample = fit_scaler_and_sample(feature_chunks, log_type)
+    iso_forest = IsolationForest(contamination=0.05, random_state=42)
+    iso_forest.fit(scaler.transform(select_features(sample, log_type)))
+    return {"scaler": scaler, "iso_forest": iso_forest}
+
+# Offset hinter der letzten vollständigen Zeile; eine unvollständige letzte Zeile wird
+# später wie beim normalen Verfolgen gelesen, sobald ihr Zeilenumbruch eintrifft
+def end_of_complete_lines(handle, block_size=65536):
+    position = handle.seek(0, os.SEEK_END)
+    while position > 0:
+        start = max(0, position - block_size)
+        handle.seek(start)
+        newline = handle.read(position - start).rfind(b"\n")
+        if newline != -1:
+            return start + newline + 1
+        position = start
+    return 0
+
+# Datei öffnen und das Modell bereitstellen: ein gespeichertes Modell (detector_models.py)
+# hat Vorrang, sonst wird es auf der Historie angepasst, falls davon genug vorhanden ist.
+# Verfolgt wird ab dem Ende der eingelesenen Historie.
+def start_following(log_file, log_type, saved_model=None):
+    stats = collect_feature_stats(log_file, log_type)
+    handle = open(log_file, "rb")
+    position = 0
+    model = None
+    if saved_model is not None:
+        # Die Historie wird nicht gebraucht, nur ihr Ende (kein zweiter Durchlauf)
+        position = end_of_complete_lines(handle)
+        stats["status_codes"] = saved_model["status_codes"]
+        model = saved_model
+        logging.info(f"[INFO] Verwende gespeichertes Modell {saved_model['version']} für {log_file}.")
+    elif stats["rows"] >= MIN_FIT_ROWS:
+        # Historie als Strom: fit_model hält nie mehr als einen Chunk im Speicher
+        def history_chunks():
+            nonlocal position
+            for chunk, end_offset in iter_log_chunks_from_offset(log_file, log_type, 0, CHUNK_SIZE):
+                position = end_offset
+                if not chunk.empty:
+                    yield chunk.rename(columns={"status": "status_code"})
+
+        model = fit_model(history_chunks(), log_type, stats)
+        logging.info(f"[INFO] Modell für {log_file} auf {stats['rows']} Zeilen angepasst.")
+    else:
+        # Vorhandene Zeilen fließen über den Micro-Batch-Pfad in das erste Modell ein
+        stats = {"rows": 0, "ip_counts": Counter(), "status_codes": []}
+        logging.info(f"[INFO] {log_file}: zu wenig Historie, Modell wird nach {MIN_FIT_ROWS} Zeilen angepasst.")
+    handle.seek(position)
+    return {
+        "log_file": log_file,
+        "log_type": log_type,
+        "handle": handle,
+        "inode": os.fstat(handle.fileno()).st_ino,
+        "buffer": b"",
+        "model": model,
+        "stats": stats,
+        "pending": [],
+        "newest_timestamp": None,
+    }
+
+# Vollständige neue Zeilen lesen, unvollständige Zeilen bleiben im Puffer
+def read_new_lines(state, max_lines=BATCH_LINES):
+    lines = []
+    while len(lines) < max_lines:
+        raw_line = state["handle"].readline()
+        if not raw_line:
+            break
+        if not raw_line.endswith(b"\n"):
+            state["buffer"] += raw_line
+            break
+        lines.append((state["buffer"] + raw_line).decode("utf-8", errors="replace"))
+        state["buffer"] = b""
+    return lines
+
+# Rotation (neue Inode unter dem Namen) und Kürzung erkennen.
+# Bei Rotation wird die alte Datei zu Ende gelesen, bevor die neue geöffnet wird.
+def check_rotation(state):
+    try:
+        path_stat = os.stat(state["log_file"])
+    except FileNotFoundError:
+        return []  # Während der Rotation kurzzeitig nicht vorhanden
+
+    remaining = []
+    if path_stat.st_ino != state["inode"]:
+        while True:
+            lines = read_new_lines(state)
+            if not lines:
+                break
+            remaining.extend(lines)
+        state["handle"].close()
+        state["handle"] = open(state["log_file"], "rb")
+        state["inode"] = os.fstat(state["handle"].fileno()).st_ino
+        state["buffer"] = b""
+        logging.info(f"[INFO] {state['log_file']} wurde rotiert, lese neue Datei.")
+    elif path_stat.st_size < state["handle"].tell():
+        state["handle"].seek(0)
+        state["buffer"] = b""
+        logging.warning(f"[WARNING] {state['log_file']} wurde gekürzt, lese von vorn.")
+    return remaining
+
+# Micro-Batch parsen und bewerten, liefert die Anomalien
+def score_lines(state, lines):
+    log_type = state["log_type"]
+    parser = RAW_PARSERS[log_type]
+    log_file_name = os.path.basename(state["log_file"])
+    entries = []
+    for line in lines:
+        entry = parser(line)
+        if entry:
+            entry["log_file"] = log_file_name
+            entries.append(entry)
+    if not entries:
+        return None
+
+    df = build_log_frame(entries, log_type).rename(columns={"status": "status_code"})
+    stats = state["stats"]
+    if log_type != "error":
+        stats["ip_counts"].update(df["ip"])
+    if df["timestamp"].dt.tz is not None and df["timestamp"].notna().any():
+        state["newest_timestamp"] = df["timestamp"].max()
+
+    if state["model"] is None:
+        # Ohne Historie: neue Zeilen sammeln, bis genug für ein Modell vorliegen
+        stats["status_codes"] = sorted(set(stats["status_codes"]) | set(df["status_code"].astype(str)))
+        state["pending"].append(df)
+        if sum(len(pending) for pending in state["pending"]) < MIN_FIT_ROWS:
+            return None
+        df = pd.concat(state["pending"], ignore_index=True)
+        state["pending"] = []
+        state["model"] = fit_model([df.copy()], log_type, stats)
+        logging.info(f"[INFO] Modell für {state['log_file']} auf {len(df)} neuen Zeilen angepasst.")
+
+    df = extract_features(df, log_type, stats)
+    features_scaled = state["model"]["scaler"].transform(select_features(df, log_type))
+    df["anomaly_score"] = state["model"]["iso_forest"].predict(features_scaled)
+    df["decision_score"] = state["model"]["iso_forest"].decision_function(features_scaled)
+    return df[df["anomaly_score"] == -1]
+
+# Anomalien ausgeben und an ANOMALY_OUTPUT anhängen
+def emit_anomalies(state, anomalies):
+    for _, anomaly in anomalies.iterrows():
+        if state["log_type"] == "error":
+            summary = f"{anomaly['client']} {anomaly['message']}"
+        else:
+            summary = f"{anomaly['ip']} \"{anomaly['method']} {anomaly['url']}\" {anomaly['status_code']}"
+        logging.warning(f"[ANOMALIE] {state['log_file']} [{anomaly['timestamp']}] Score {anomaly['decision_score']:.3f}: {summary}")
+    append_json_lines(anomalies, ANOMALY_OUTPUT)
+
+# Statusmeldung mit Durchsatz und Verzögerung
+def report(states, lines, anomalies, elapsed):
+    backlog = 0
+    for state in states.values():
+        try:
+            backlog += max(0, os.fstat(state["handle"].fileno()).st_size - state["handle"].tell())
+        except OSError:
+            pass
+    newest = [state["newest_timestamp"] for state in states.values() if state["newest_timestamp"] is not None]
+    lag = f"{time.time() - max(newest).timestamp():.1f}s" if newest else "unbekannt"
+    logging.info(
+        f"[INFO] {lines / elapsed:,.0f} Zeilen/s, Verzögerung zum neuesten Zeitstempel: {lag}, "
+        f"ausstehend: {backlog} Bytes, Anomalien: {anomalies}"
+    )
+
+# Neue Dateien in log_folder aufnehmen (versteckte und unbekannte Typen auslassen).
+# Bereits verfolgte Inodes werden übersprungen, damit rotierte Dateien unter neuem
+# Namen (access.log -> access.log.1) nicht erneut gelesen werden.
+def discover_files(log_folder, states, seen_inodes, saved_models):
+    for state in states.values():
+        seen_inodes.add(state["inode"])
+    for name in sorted(os.listdir(log_folder)):
+        log_file = os.path.join(log_folder, name)
+        if log_file in states or name.startswith(".") or not os.path.isfile(log_file):
+            continue
+        try:
+            if os.stat(log_file).st_ino in seen_inodes:
+                continue
+        except FileNotFoundError:
+            continue  # Zwischen listdir und stat wegrotiert
+        log_type = get_log_type(log_file)
+        if log_type == "unknown":
+            continue
+        logging.info(f"[INFO] Verfolge Datei: {log_file} als Typ: {log_type}")
+        if log_type not in saved_models:
+            saved_models[log_type] = load_models(log_type, load_autoencoder=False)
+        states[log_file] = start_following(log_file, log_type, saved_models[log_type])
+
+# Hauptschleife des Follow-Modus
+def follow(log_folder=LOG_FOLDER):
+    os.makedirs(os.path.dirname(ANOMALY_OUTPUT), exist_ok=True)
+    states = {}
+    seen_inodes = set()
+    saved_models = {}
+    lines_since_report = 0
+    anomalies_since_report = 0
+    last_report = time.monotonic()
+
+    try:
+        while True:
+            discover_files(log_folder, states, seen_inodes, saved_models)
+
+            read_any = False
+            for state in states.values():
+                lines = check_rotation(state) + read_new_lines(state)
+                if not lines:
+                    continue
+                read_any = True
+                lines_since_report += len(lines)
+                anomalies = score_lines(state, lines)
+                if anomalies is not None and not anomalies.empty:
+                    anomalies_since_report += len(anomalies)
+                    emit_anomalies(state, anomalies)
+
+            now = time.monotonic()
+            if now - last_report >= REPORT_INTERVAL:
+                report(states, lines_since_report, anomalies_since_report, now - last_report)
+                lines_since_report = 0
+                anomalies_since_report = 0
+                last_report = now
+
+            if not read_any:
+                time.sleep(POLL_INTERVAL)
+    except KeyboardInterrupt:
+        logging.info("[INFO] Follow-Modus beendet.")
+    finally:
+        for state in states.values():
+            state["handle"].close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    follow()
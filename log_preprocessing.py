@@ -0,0 +1,78 @@
+# File: log_preprocessing.py
+
+import re
+
+# Vorverarbeitung der Log-Zeilen für den Klassifikator, gemeinsam genutzt von
+# Training (log_classification.py) und Vorhersage (app.py, log_test_classification.py).
+# Das Ergebnis entspricht den früheren einzelnen re.sub-Schritten in preprocess_logs:
+# IP-Adressen -> "ip", Inhalte in eckigen Klammern (Zeitstempel) -> "timestamp",
+# Sonderzeichen außer / ? . = & entfernen, Kleinschreibung.
+IP_PATTERN = re.compile(r'\d+\.\d+\.\d+\.\d+')
+TIMESTAMP_PATTERN = re.compile(r'\[[^\]]+\]')
+SPECIAL_CHAR_PATTERN = re.compile(r'[^\w\s/?.=&]')
+
+# Dateiname der gespeicherten Pipeline aus Vorverarbeitung und TF-IDF-Vektorisierer
+TEXT_PIPELINE_PATH = "log_text_pipeline.pkl"
+
+# Merkmale aus Wort-2/3-Grammen: "tfidf" (Vokabular aus den Trainingsdaten) oder
+# "hashing" (zustandslos, n-Gramme werden auf HASHING_FEATURES Spalten gehasht)
+FEATURE_MODES = ("tfidf", "hashing")
+HASHING_FEATURES = 2 ** 14
+
+# Übersetzungstabelle für str.translate: Sonderzeichen werden gelöscht (None),
+# alle anderen Zeichen bleiben erhalten. Jedes Zeichen wird nur beim ersten
+# Auftreten über SPECIAL_CHAR_PATTERN geprüft, danach aus der Tabelle gelesen.
+class SpecialCharTable(dict):
+    def __missing__(self, code):
+        value = None if SPECIAL_CHAR_PATTERN.match(chr(code)) else code
+        self[code] = value
+        return value
+
+SPECIAL_CHARS = SpecialCharTable()
+
+# Einzelne Zeile vorverarbeiten
+def preprocess_log_line(line):
+    line = TIMESTAMP_PATTERN.sub("TIMESTAMP", IP_PATTERN.sub("IP", line))
+    return line.translate(SPECIAL_CHARS).lower()
+
+# Folge von Log-Zeilen (Liste oder Series) in einem Durchlauf vorverarbeiten
+def preprocess_logs_text(logs):
+    return [preprocess_log_line(line) for line in logs]
+
+# Vektorisierer für den gewählten Merkmalsmodus. "tfidf" baut das Vokabular aller n-Gramme
+# auf und kürzt es danach (max_features, min_df, max_df). "hashing" braucht kein Vokabular;
+# mit idf=True zählt ein TfidfTransformer die Dokumentfrequenzen der gehashten Spalten im
+# selben Durchlauf, ohne idf werden die Zählwerte nur L2-normiert.
+def build_vectorizer(feature_mode="tfidf", idf=True, n_features=HASHING_FEATURES):
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+    from sklearn.pipeline import Pipeline
+
+    if feature_mode == "tfidf":
+        return TfidfVectorizer(max_features=10000, ngram_range=(2, 3), stop_words='english', max_df=0.95, min_df=5)
+    if feature_mode != "hashing":
+        raise ValueError(f"Unbekannter Merkmalsmodus {feature_mode!r}, erwartet: {', '.join(FEATURE_MODES)}")
+
+    hashing = HashingVectorizer(
+        n_features=n_features, ngram_range=(2, 3), stop_words='english',
+        alternate_sign=False, norm=None if idf else "l2",
+    )
+    if not idf:
+        return hashing
+    return Pipeline([("hashing", hashing), ("idf", TfidfTransformer())])
+
+# Pipeline aus Vorverarbeitung und Vektorisierer, wird als ein Artefakt gespeichert
+def build_text_pipeline(vectorizer):
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+
+    return Pipeline([
+        ("preprocess", FunctionTransformer(preprocess_logs_text)),
+        ("vectorizer", vectorizer),
+    ])
+
+# Bereits vorverarbeitete Zeilen vektorisieren: Der Schritt "preprocess" der Pipeline
+# wird übersprungen, damit jede Zeile nur einmal vorverarbeitet wird (app.py)
+def transform_preprocessed(text_pipeline, texts):
+    if text_pipeline.steps[0][0] == "preprocess":
+        return text_pipeline[1:].transform(texts)
+    return text_pipeline.transform(texts)
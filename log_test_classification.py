@@ -1,12 +1,22 @@
 # File: log_test_classification.py
 
+import os
 import joblib
+from log_preprocessing import TEXT_PIPELINE_PATH
+from forest_arrays import FOREST_ARRAYS_PATH, export_forest, load_array_forest
 
-# Funktion zur Vorhersage für neue Logs
-def classify_logs(new_logs_path, model_path="log_classifier.pkl", vectorizer_path="log_vectorizer.pkl", num_lines=100):
-    # Modell und Vektorisierer laden
-    model = joblib.load(model_path)
-    vectorizer = joblib.load(vectorizer_path)
+# Funktion zur Vorhersage für neue Logs; backend="arrays" rechnet mit den exportierten
+# Baum-Arrays (forest_arrays.py) statt mit sklearn, die Wahrscheinlichkeiten sind gleich
+def classify_logs(new_logs_path, model_path="log_classifier.pkl", pipeline_path=TEXT_PIPELINE_PATH, num_lines=100,
+                  backend="sklearn", forest_path=FOREST_ARRAYS_PATH):
+    # Modell und Pipeline (Vorverarbeitung + Vektorisierer) laden
+    if backend == "arrays" and os.path.isfile(forest_path):
+        model = load_array_forest(forest_path)
+    elif backend == "arrays":
+        model = export_forest(joblib.load(model_path))
+    else:
+        model = joblib.load(model_path)
+    text_pipeline = joblib.load(pipeline_path)
 
     # Neue Logs lesen
     print("[INFO] Lesen der neuen Logs...")
@@ -15,7 +25,7 @@ def classify_logs(new_logs_path, model_path="log_classifier.pkl", vectorizer_pat
 
     # Vorhersage durchführen
     print("[INFO] Vorhersage...")
-    new_logs_tfidf = vectorizer.transform(new_logs)
+    new_logs_tfidf = text_pipeline.transform(new_logs)
     predictions = model.predict_proba(new_logs_tfidf)
 
     # Ergebnisse ausgeben
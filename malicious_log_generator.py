@@ -1,39 +1,25 @@
-import mysql.connector
 from datetime import datetime
 import random
 import re
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-
-# MySQL-Datenbankkonfiguration
-DB_HOST = "localhost"
-DB_USER = "root"
-DB_PASSWORD = ""  # Falls nötig, Passwort hinzufügen
-DB_NAME = "log_generator"
-
-# Verbindung zur MySQL-Datenbank herstellen
-def connect_to_db():
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME
-        )
-        print("[INFO] Datenbankverbindung erfolgreich hergestellt.")
-        return conn
-    except mysql.connector.Error as err:
-        print(f"[ERROR] Fehler bei der Verbindung zur Datenbank: {err}")
-        raise SystemExit
+from mysql_db import fetch_all, iter_rows
 
 # Daten aus einer Tabelle abrufen
 def fetch_data_from_table(table_name):
-    conn = connect_to_db()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM {table_name}")
-    result = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return result
+    return fetch_all(f"SELECT * FROM {table_name}", dictionary=True)
+
+# Zufällige Stichprobe von höchstens k Zeilen (Reservoir-Sampling über die
+# gestreamten Zeilen, die Tabelle wird nicht vollständig in den Speicher geladen)
+def sample_rows_from_table(table_name, k):
+    sample = []
+    for index, row in enumerate(iter_rows(f"SELECT * FROM {table_name}", dictionary=True)):
+        if index < k:
+            sample.append(row)
+        else:
+            slot = random.randint(0, index)
+            if slot < k:
+                sample[slot] = row
+    return sample
 
 # Angriffsmuster bereinigen
 def clean_attack_entry(entry):
@@ -134,8 +120,8 @@ def generate_malicious_logs(entry_count=50):
     for attack_type, table_name in attack_tables.items():
         attack_patterns[attack_type] = [clean_attack_entry(row['entry']) for row in fetch_data_from_table(table_name)]
 
-    # Basis-Logs abrufen
-    base_logs = fetch_data_from_table("myfiles_logs")
+    # Basis-Logs abrufen (eine Stichprobe reicht, da je Eintrag ein Basis-Log gezogen wird)
+    base_logs = sample_rows_from_table("myfiles_logs", entry_count)
 
     # Datei für Logs vorbereiten
     log_file = f"malicious_myfiles_{datetime.now().strftime('%Y%m%d%H%M%S')}.log"
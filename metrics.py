@@ -0,0 +1,151 @@
+# File: metrics.py
+
+import os
+import time
+import bisect
+import resource
+import threading
+
+# Schlanke Metriken im Prometheus-Textformat (ohne zusätzliche Abhängigkeit).
+# observe()/inc() kosten nur eine Sperre, eine Binärsuche und ein paar Additionen
+# und dürfen aus der Event-Loop wie aus Threads aufgerufen werden.
+
+# Standard-Buckets für Latenzen in Sekunden und für Batch-Größen
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+def format_labels(label_names, label_values, extra=()):
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = sorted(self.values.items())
+        for label_values, value in items:
+            lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(label_names)
+        # Je Label-Kombination: [Zähler je Bucket (nicht kumuliert) + Überlauf, Summe]
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted((labels, (list(counts), total)) for labels, (counts, total) in self.series.items())
+        for label_values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = format_labels(self.label_names, label_values, [("le", format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+# Speicher und CPU-Zeit des eigenen Prozesses (RSS aus /proc, sonst Höchstwert aus getrusage)
+def process_metrics():
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            rss = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return [
+        "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+        "# TYPE process_resident_memory_bytes gauge",
+        f"process_resident_memory_bytes {rss}",
+        "# HELP process_max_resident_memory_bytes Peak resident memory size in bytes.",
+        "# TYPE process_max_resident_memory_bytes gauge",
+        f"process_max_resident_memory_bytes {max_rss}",
+        "# HELP process_cpu_seconds_total Total user and system CPU time spent in seconds.",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {format_value(time.process_time())}",
+    ]
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, label_names=()):
+        metric = Counter(name, help_text, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, buckets=LATENCY_BUCKETS, label_names=()):
+        metric = Histogram(name, help_text, buckets, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        lines.extend(process_metrics())
+        return "\n".join(lines) + "\n"
+
+# Reine ASGI-Middleware: zählt Anfragen je Route, Methode und Statuscode und misst
+# ihre Dauer bis zum letzten gesendeten Block (auch bei Streaming-Antworten)
+class RequestMetricsMiddleware:
+    def __init__(self, app, requests_total, request_seconds):
+        self.app = app
+        self.requests_total = requests_total
+        self.request_seconds = request_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            self.requests_total.inc(path, scope["method"], str(status[0]))
+            self.request_seconds.observe(time.perf_counter() - start, path)
@@ -0,0 +1,109 @@
+# File: mysql_db.py
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+import mysql.connector
+from mysql.connector import pooling
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Gemeinsamer Datenbankzugriff für app.py und die Generator-/Import-Skripte.
+# Verbindungen kommen aus einem Pool und werden nach Gebrauch zurückgegeben statt
+# für jede Abfrage neu aufgebaut. Konfiguration über Umgebungsvariablen (.env).
+DB_HOST = os.getenv("DB_HOST", "localhost")
+DB_PORT = int(os.getenv("DB_PORT", "3306"))
+DB_USER = os.getenv("DB_USER", "root")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "")
+DB_NAME = os.getenv("DB_NAME", "log_generator")
+
+# Größe des Pools (mysql-connector erlaubt höchstens 32 Verbindungen je Pool)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+
+# Zeilen pro fetchmany beim Streamen großer Ergebnisse
+STREAM_BATCH_SIZE = 1000
+
+# Ein Pool je Verbindungsart (LOAD DATA LOCAL INFILE braucht eine eigene Option);
+# die Semaphore lässt Aufrufer warten, statt bei leerem Pool einen Fehler zu werfen
+pools = {}
+pool_slots = {}
+pools_lock = threading.Lock()
+
+def get_pool(allow_local_infile=False):
+    with pools_lock:
+        pool = pools.get(allow_local_infile)
+        if pool is None:
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"log_generator_{'infile' if allow_local_infile else 'default'}",
+                pool_size=DB_POOL_SIZE,
+                host=DB_HOST,
+                port=DB_PORT,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                database=DB_NAME,
+                allow_local_infile=allow_local_infile,
+                # Nicht gelesene Zeilen eines abgebrochenen Streams verwerfen,
+                # damit die Verbindung sauber in den Pool zurückgeht
+                consume_results=True,
+            )
+            pools[allow_local_infile] = pool
+            pool_slots[allow_local_infile] = threading.BoundedSemaphore(DB_POOL_SIZE)
+        return pool, pool_slots[allow_local_infile]
+
+# Verbindung aus dem Pool; beim Verlassen des with-Blocks geht sie zurück in den Pool.
+# Verbindungsfehler gehen an logging (in app.py über die Log-Queue) und an den Aufrufer.
+@contextmanager
+def connection(allow_local_infile=False):
+    try:
+        pool, slots = get_pool(allow_local_infile)
+    except mysql.connector.Error as err:
+        logging.error(f"[ERROR] Fehler bei der Verbindung zur Datenbank: {err}")
+        raise
+    with slots:
+        try:
+            conn = pool.get_connection()
+        except mysql.connector.Error as err:
+            logging.error(f"[ERROR] Keine Verbindung aus dem Pool erhalten: {err}")
+            raise
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+# Abfrage ausführen und alle Zeilen zurückgeben (für kleine Ergebnisse)
+def fetch_all(query, params=None, dictionary=False):
+    with connection() as conn:
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+# Zeilen großer Ergebnisse streamen: ungepufferter Cursor, der Server liefert die
+# Zeilen blockweise nach, statt das ganze Ergebnis im Client zu puffern
+def iter_rows(query, params=None, dictionary=False, batch_size=STREAM_BATCH_SIZE):
+    with connection() as conn:
+        cursor = conn.cursor(dictionary=dictionary, buffered=False)
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+# Einzelne Anweisung ausführen und committen
+def execute(query, params=None):
+    with connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+        finally:
+            cursor.close()
@@ -1,43 +1,19 @@
 # File: mysql_log_generator.py
 
-import mysql.connector
 from datetime import datetime
-
-# MySQL-Datenbankkonfiguration
-DB_HOST = "localhost"
-DB_USER = "root"
-DB_PASSWORD = ""  # Falls nötig, Passwort hinzufügen
-DB_NAME = "log_generator"
+from mysql_db import iter_rows
 
 # Standardkonfiguration für die Anzahl der Einträge und Filter
 DEFAULT_ENTRY_COUNT = 100
 DEFAULT_ID_RANGE = (1, 1000)  # Standardmäßiger ID-Bereich
 DEFAULT_TIME_SPAN = None  # Kein Zeitfilter standardmäßig
 
-# Verbindung zur MySQL-Datenbank herstellen
-def connect_to_db():
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_NAME
-        )
-        print("[INFO] Datenbankverbindung erfolgreich hergestellt.")
-        return conn
-    except mysql.connector.Error as err:
-        print(f"[ERROR] Fehler bei der Verbindung zur Datenbank: {err}")
-        raise SystemExit
-
-# Daten aus der MySQL-Datenbank abrufen
-def fetch_data_from_db(query):
-    conn = connect_to_db()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute(query)
-    result = cursor.fetchall()
-    cursor.close()
-    conn.close()
-    return result
+# Höchstens limit Zeilen aus der MySQL-Datenbank abrufen; das LIMIT steht in der
+# Abfrage, damit der Server nicht mehr Zeilen liest und sendet als nötig
+def fetch_data_from_db(query, limit=None):
+    if limit is None:
+        return list(iter_rows(query, dictionary=True))
+    return list(iter_rows(f"{query.rstrip()} LIMIT %s", (int(limit),), dictionary=True))
 
 # Log-Einträge generieren
 def generate_access_log_entry(row):
@@ -86,7 +62,7 @@ def generate_logs(entry_count=DEFAULT_ENTRY_COUNT, id_range=DEFAULT_ID_RANGE, ti
 
     for log_type, query in queries.items():
         print(f"[INFO] Generiere {log_type}-Logs...")
-        data = fetch_data_from_db(query)
+        data = fetch_data_from_db(query, entry_count)
         
         # Prüfen, ob genügend Einträge vorhanden sind
         available_entries = len(data)
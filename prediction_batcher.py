@@ -0,0 +1,96 @@
+# File: prediction_batcher.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Micro-Batching für Vorhersagen: Anfragen, die innerhalb von max_wait Sekunden
+# eintreffen, werden zu einem Batch (eine Sparse-Matrix) zusammengefasst, in einem
+# Thread-Pool vorhergesagt und die Ergebnisse wieder auf die Aufrufer verteilt.
+# So blockiert die Vorhersage nicht die Event-Loop, und viele kleine Anfragen
+# teilen sich einen Aufruf von transform/predict_proba.
+class PredictionBatcher:
+    def __init__(self, predict_batch, max_batch_size=64, max_wait=0.005, workers=1):
+        # predict_batch(logs) -> eine Ergebniszeile je Log, z. B. predict_proba
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.workers = workers
+        self.queue = None
+        self.executor = None
+        self.tasks = []
+        self.batches = 0
+        self.batched_logs = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predict")
+        self.tasks = [asyncio.create_task(self.run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self.executor.shutdown(wait=True)
+
+    # Logs einer Anfrage einreihen und auf deren Ergebnisse warten. Große Anfragen
+    # werden in Teile mit höchstens max_batch_size Logs zerlegt, die Ergebnisse kommen
+    # in der ursprünglichen Reihenfolge zurück.
+    async def predict(self, logs):
+        logs = list(logs)
+        if not logs:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = []
+        for start in range(0, len(logs), self.max_batch_size):
+            future = loop.create_future()
+            await self.queue.put((logs[start:start + self.max_batch_size], future))
+            futures.append(future)
+        if len(futures) == 1:
+            return await futures[0]
+        parts = await asyncio.gather(*futures)
+        return [row for part in parts for row in part]
+
+    # Anfragen sammeln, bis max_batch_size Logs vorliegen oder max_wait abgelaufen ist.
+    # Ein Teil, der nicht mehr in den Batch passt, wird als erster des nächsten zurückgegeben.
+    async def collect_batch(self, first=None):
+        batch = [first if first is not None else await self.queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if size + len(item[0]) > self.max_batch_size:
+                return batch, item
+            batch.append(item)
+            size += len(item[0])
+        return batch, None
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        leftover = None
+        while True:
+            batch, leftover = await self.collect_batch(leftover)
+            logs = [log for request_logs, _ in batch for log in request_logs]
+            try:
+                results = await loop.run_in_executor(self.executor, self.predict_batch, logs)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.batched_logs += len(logs)
+            start = 0
+            for request_logs, future in batch:
+                end = start + len(request_logs)
+                if not future.done():
+                    future.set_result(results[start:end])
+                start = end
@@ -0,0 +1,51 @@
+# File: prediction_cache.py
+
+import hashlib
+from collections import OrderedDict
+
+# Begrenzter LRU-Cache für Vorhersagen. Der Schlüssel ist ein Hash aus Modellversion
+# und vorverarbeiteter Log-Zeile (IP-Adressen und Zeitstempel maskiert), sodass
+# gleich aufgebaute Anfragen dieselbe Vorhersage teilen. Der Cache wird nur aus der
+# Event-Loop verwendet und braucht daher keine Sperre.
+class PredictionCache:
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(normalized_line, model_version):
+        return hashlib.blake2b(f"{model_version}\0{normalized_line}".encode("utf-8"), digest_size=16).digest()
+
+    # Vorhersage zum Schlüssel oder None
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    # Alle Einträge verwerfen, z. B. nach dem Neuladen des Modells
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 4) if requests else 0.0,
+        }
@@ -0,0 +1,38 @@
+# File: request_logging.py
+
+import json
+import queue
+import random
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+# Logging über eine Queue: Der Aufrufer legt nur den LogRecord in die Queue,
+# Formatierung und Schreiben (Datei, Terminal) übernimmt ein Hintergrund-Thread.
+# Gibt den gestarteten QueueListener zurück (stop() schreibt die Queue leer).
+def setup_queue_logging(handlers, level=logging.INFO, fmt="%(asctime)s - %(levelname)s - %(message)s"):
+    formatter = logging.Formatter(fmt)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    queue_handler = QueueHandler(log_queue)
+    # Die Nachricht wird erst im Listener formatiert (Zeitstempel, Level)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=level, handlers=[queue_handler], force=True)
+    listener.start()
+    return listener
+
+# Text auf max_chars Zeichen kürzen (mit Hinweis auf die ursprüngliche Länge)
+def truncate(value, max_chars):
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= max_chars:
+        return text
+    return f"{text[:max_chars]}... ({len(text)} Zeichen)"
+
+# Entscheidet, ob die Nutzdaten einer Anfrage mitgeloggt werden (Anteil sample_rate)
+def sample_payload(sample_rate):
+    return sample_rate >= 1 or (sample_rate > 0 and random.random() < sample_rate)
+
+# Eine strukturierte Log-Zeile (JSON) je Anfrage
+def log_request(event, **fields):
+    logging.info(json.dumps(dict(event=event, **fields), ensure_ascii=False, default=str))
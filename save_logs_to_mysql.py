@@ -1,128 +1,175 @@
 # File: save_logs_to_mysql.py
 
 import os
-import re
-import mysql.connector
-import pandas as pd
+import tempfile
 from datetime import datetime
+import pandas as pd
+import mysql.connector
+from mysql_db import connection, execute, fetch_all
+from log_analysis.parsing import read_log_file, iter_log_chunks, iter_log_chunks_from_offset
 
 def log(message, level="INFO"):
     levels = {"INFO": "[INFO]", "WARNING": "[WARNING]", "ERROR": "[ERROR]"}
     prefix = levels.get(level, "[INFO]")
     print(f"{prefix} {message}")
 
-# MySQL-Datenbankkonfiguration
-DB_HOST = "localhost"
-DB_USER = "root"
-DB_NAME = "log_generator"
+# Anzahl der Zeilen, die gleichzeitig im Speicher gehalten werden
+CHUNK_SIZE = 100000
 
-# Verbindung zur MySQL-Datenbank herstellen
-def connect_to_db():
-    try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            database=DB_NAME
-        )
-        log("Datenbankverbindung erfolgreich hergestellt.", "INFO")
-        return conn
-    except mysql.connector.Error as err:
-        log(f"Fehler bei der Verbindung zur Datenbank: {err}", "ERROR")
-        raise SystemExit
+# Tabelle mit den Import-Checkpoints (Inode, Größe und Byte-Offset je Datei)
+CHECKPOINT_TABLE = "ingest_checkpoints"
+
+# Einfügemodus ("row", "executemany" oder "load_data") und Zeilen pro Batch/Commit
+INSERT_MODE = "executemany"
+BATCH_SIZE = 5000
 
 # Tabelle erstellen, falls nicht vorhanden
 def create_table_if_not_exists(table_name, fields):
-    conn = connect_to_db()
-    cursor = conn.cursor()
-
     columns = ", ".join([f"{field} {datatype}" for field, datatype in fields.items()])
-    cursor.execute(f"""
+    execute(f"""
         CREATE TABLE IF NOT EXISTS {table_name} (
             id INT AUTO_INCREMENT PRIMARY KEY,
             {columns}
         )
     """)
-    conn.commit()
-    cursor.close()
-    conn.close()
     log(f"Tabelle '{table_name}' erstellt oder existiert bereits.", "INFO")
 
-# Log-Parsing-Funktionen
-def parse_access_log(line):
-    pattern = re.compile(
-        r'(?P<ip>\S+) - - \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
-    )
-    match = pattern.match(line)
-    if match:
-        data = match.groupdict()
-        data["timestamp"] = datetime.strptime(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
-        data["size"] = None if data["size"] == "-" else int(data["size"])
-        return data
-    return None
-
-def parse_error_log(line):
-    pattern = re.compile(
-        r'(?P<timestamp>\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}) \[(?P<severity>error)] (?P<module>[^:]+): \*(?P<pid>\d+) (?P<message>.+), client: (?P<client>[^,]+), server: (?P<server>[^,]+), request: \"(?P<request>[^\"]+)\", host: \"(?P<host>[^\"]+)\"'
-    )
-    match = pattern.match(line)
-    if match:
-        data = match.groupdict()
-        data["timestamp"] = datetime.strptime(data["timestamp"], "%Y/%m/%d %H:%M:%S")
-        return data
-    return None
-
-def parse_myfiles_log(line):
-    pattern = re.compile(
-        r'(?P<ip>\S+) - (?P<user>\S+) \[(?P<timestamp>[^\]]+)] \"(?P<method>\S+) (?P<url>\S+) (?P<http_version>HTTP/\d\.\d)\" (?P<status>\d+) (?P<size>\d+|-) \"(?P<referrer>[^\"]*)\" \"(?P<user_agent>[^\"]*)\"'
-    )
-    match = pattern.match(line)
-    if match:
-        data = match.groupdict()
-        data["timestamp"] = datetime.strptime(data["timestamp"], "%d/%b/%Y:%H:%M:%S %z")
-        data["size"] = None if data["size"] == "-" else int(data["size"])
-        return data
-    return None
-
-# Log-Datei verarbeiten
+# Log-Datei verarbeiten. Zeitstempel werden wie bisher als Ortszeit der Log-Zeile
+# gespeichert (DATETIME ohne Zeitzone), nicht nach UTC umgerechnet.
 def process_log_file(log_file, log_type):
-    data = []
-    with open(log_file, "r") as file:
-        for line in file:
-            if log_type == "myfiles" and "myfiles" in log_file:
-                entry = parse_myfiles_log(line)
-            elif log_type == "error" and "error" in log_file:
-                entry = parse_error_log(line)
-            elif log_type == "access":
-                entry = parse_access_log(line)
-            else:
-                entry = None
+    return read_log_file(log_file, log_type, wall_clock=True)
 
-            if entry:
-                entry["log_file"] = os.path.basename(log_file)
-                data.append(entry)
-    return pd.DataFrame(data)
+# Log-Datei in DataFrames mit höchstens chunk_size Zeilen verarbeiten
+def process_log_file_chunked(log_file, log_type, chunk_size=CHUNK_SIZE):
+    return iter_log_chunks(log_file, log_type, chunk_size, wall_clock=True)
 
-# Daten in die MySQL-Datenbank einfügen
-def save_to_database(df, table_name):
-    conn = connect_to_db()
-    cursor = conn.cursor()
+# DataFrame in Python-Werte umwandeln (NaN/NaT werden zu None). Ganzzahlige Spalten, die
+# durch fehlende Werte zu float64 wurden (z. B. size), werden wieder zu int, damit alle
+# Einfügemodi "1" statt "1.0" in INT-Spalten schreiben.
+def dataframe_to_rows(df):
+    df = df.copy()
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            df[column] = values.astype("Int64")
+    values = df.astype(object).where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+# Wert für eine LOAD-DATA-Datei im Standardformat von MySQL kodieren
+def tsv_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\0", "\\0")
+    )
 
-    for _, row in df.iterrows():
-        columns = ", ".join(row.keys())
-        placeholders = ", ".join(["%s"] * len(row))
-        values = tuple(row)
+# Einen Batch über eine temporäre TSV-Datei mit LOAD DATA LOCAL INFILE laden
+def load_batch(cursor, table_name, columns, rows):
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".tsv", delete=False) as file:
+        for row in rows:
+            file.write("\t".join(tsv_value(value) for value in row) + "\n")
+        tsv_path = file.name
+    try:
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table_name} CHARACTER SET utf8mb4 ({columns})",
+            (tsv_path,),
+        )
+    finally:
+        os.remove(tsv_path)
+
+# Daten in die MySQL-Datenbank einfügen
+# mode: "row" (ein INSERT pro Zeile), "executemany" (Batch-INSERT) oder
+# "load_data" (LOAD DATA LOCAL INFILE). Bei den Bulk-Modi wird pro Batch committet.
+# Mit checkpoint=(log_file, inode, size, byte_offset) werden alle Batches und der
+# Checkpoint in einer Transaktion geschrieben: Nach einem Abbruch ist entweder der
+# ganze Chunk samt Checkpoint gespeichert oder nichts davon, es gibt keine Duplikate.
+def save_to_database(df, table_name, mode=INSERT_MODE, batch_size=BATCH_SIZE, checkpoint=None):
+    columns = ", ".join(df.columns)
+    placeholders = ", ".join(["%s"] * len(df.columns))
+    insert_query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
 
+    with connection(allow_local_infile=(mode == "load_data")) as conn:
+        cursor = conn.cursor()
         try:
-            cursor.execute(f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})", values)
+            if mode == "row":
+                for row in dataframe_to_rows(df):
+                    cursor.execute(insert_query, row)
+            else:
+                rows = dataframe_to_rows(df)
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    if mode == "load_data":
+                        load_batch(cursor, table_name, columns, batch)
+                    else:
+                        cursor.executemany(insert_query, batch)
+                    if checkpoint is None:
+                        conn.commit()
+            if checkpoint is not None:
+                cursor.execute(CHECKPOINT_UPSERT, checkpoint)
+            if mode == "row" or checkpoint is not None:
+                conn.commit()
         except mysql.connector.Error as err:
+            conn.rollback()
             log(f"Fehler beim Einfügen von Daten: {err}", "ERROR")
             raise SystemExit
+        finally:
+            cursor.close()
 
-    conn.commit()
-    cursor.close()
-    conn.close()
     log(f"{len(df)} Datensätze in die Tabelle '{table_name}' eingefügt.", "INFO")
 
+CHECKPOINT_UPSERT = f"""
+    INSERT INTO {CHECKPOINT_TABLE} (log_file, inode, size, byte_offset, updated_at)
+    VALUES (%s, %s, %s, %s, NOW())
+    ON DUPLICATE KEY UPDATE inode = VALUES(inode), size = VALUES(size),
+        byte_offset = VALUES(byte_offset), updated_at = VALUES(updated_at)
+"""
+
+# Checkpoint-Tabelle: bis zu welchem Byte-Offset eine Datei bereits importiert wurde
+def create_checkpoint_table():
+    execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            log_file VARCHAR(255) PRIMARY KEY,
+            inode BIGINT UNSIGNED NOT NULL,
+            size BIGINT UNSIGNED NOT NULL,
+            byte_offset BIGINT UNSIGNED NOT NULL,
+            updated_at DATETIME NOT NULL,
+            INDEX (inode)
+        )
+    """)
+    log(f"Tabelle '{CHECKPOINT_TABLE}' erstellt oder existiert bereits.", "INFO")
+
+# Alle Checkpoints zu Beginn eines Laufs laden (Dateiname -> Checkpoint)
+def load_checkpoints():
+    rows = fetch_all(f"SELECT log_file, inode, size, byte_offset FROM {CHECKPOINT_TABLE}", dictionary=True)
+    return {row["log_file"]: row for row in rows}
+
+def save_checkpoint(log_file, inode, size, byte_offset):
+    execute(CHECKPOINT_UPSERT, (log_file, inode, size, byte_offset))
+
+# Offset bestimmen, ab dem eine Datei weitergelesen wird
+def find_resume_offset(log_file, file_stat, checkpoints):
+    checkpoint = checkpoints.get(log_file)
+    if checkpoint is None:
+        # Rotierte Datei unter neuem Namen: Checkpoint über die Inode finden
+        checkpoint = next((cp for cp in checkpoints.values() if cp["inode"] == file_stat.st_ino), None)
+        if checkpoint is None:
+            return 0
+        log(f"Datei {log_file} ist die rotierte Datei {checkpoint['log_file']}.", "INFO")
+    if checkpoint["inode"] != file_stat.st_ino:
+        log(f"Datei {log_file} wurde rotiert, Import beginnt von vorn.", "WARNING")
+        return 0
+    if file_stat.st_size < checkpoint["byte_offset"]:
+        log(f"Datei {log_file} wurde gekürzt, Import beginnt von vorn.", "WARNING")
+        return 0
+    return checkpoint["byte_offset"]
+
 # Hauptablauf
 def main():
     log_folder = "share_logs"
@@ -183,6 +230,8 @@ def main():
 
     for log_type, definition in log_definitions.items():
         create_table_if_not_exists(definition["table"], definition["fields"])
+    create_checkpoint_table()
+    checkpoints = load_checkpoints()
 
     total_files = len(all_files)
     for idx, log_file in enumerate(all_files, start=1):
@@ -196,13 +245,34 @@ def main():
         table_name = log_definitions[log_type]["table"]
 
         log(f"Verarbeite Datei {idx}/{total_files}: {log_file} als Typ: {log_type}", "INFO")
-        df = process_log_file(log_file, log_type)
+        file_stat = os.stat(log_file)
+        offset = find_resume_offset(log_file, file_stat, checkpoints)
+
+        # Neue oder umbenannte Dateien sofort unter ihrem Namen registrieren
+        if log_file not in checkpoints:
+            save_checkpoint(log_file, file_stat.st_ino, file_stat.st_size, offset)
+
+        if offset == file_stat.st_size:
+            log(f"Datei {log_file} enthält keine neuen Daten.", "INFO")
+            continue
+        if offset > 0:
+            log(f"Setze Import von {log_file} ab Byte {offset} fort.", "INFO")
+
+        # Jeder Chunk wird zusammen mit seinem Checkpoint in einer Transaktion gespeichert
+        saved_rows = 0
+        for chunk, end_offset in iter_log_chunks_from_offset(log_file, log_type, offset, CHUNK_SIZE, wall_clock=True):
+            checkpoint = (log_file, file_stat.st_ino, max(file_stat.st_size, end_offset), end_offset)
+            if not chunk.empty:
+                save_to_database(chunk, table_name, checkpoint=checkpoint)
+                saved_rows += len(chunk)
+            elif end_offset != offset:
+                save_checkpoint(*checkpoint)
+            offset = end_offset
 
-        if df.empty:
+        if saved_rows == 0:
             log(f"Datei {log_file} enthält keine gültigen Daten.", "WARNING")
             continue
 
-        save_to_database(df, table_name)
         log(f"Fortschritt: {idx}/{total_files} Dateien verarbeitet.", "INFO")
 
 if __name__ == "__main__":
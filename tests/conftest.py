@@ -0,0 +1,7 @@
+# File: tests/conftest.py
+
+import os
+import sys
+
+# Die Module liegen direkt im Projektverzeichnis (ohne Paket)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+# File: tests/test_save_logs_to_mysql.py
+
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+import save_logs_to_mysql
+
+# Verbindung ohne Datenbank: hält die Parameter der INSERTs bzw. den Inhalt der
+# LOAD-DATA-Datei fest (die temporäre Datei existiert nur während execute)
+class FakeCursor:
+    def __init__(self, captured):
+        self.captured = captured
+
+    def execute(self, query, params=None):
+        if query.startswith("LOAD DATA"):
+            with open(params[0], "r", encoding="utf-8") as file:
+                for line in file.read().splitlines():
+                    self.captured.append(tuple(None if value == "\\N" else value for value in line.split("\t")))
+        elif query.startswith("INSERT INTO"):
+            self.captured.append(params)
+
+    def executemany(self, query, rows):
+        self.captured.extend(rows)
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    def __init__(self, captured):
+        self.captured = captured
+
+    def cursor(self):
+        return FakeCursor(self.captured)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+def saved_rows(monkeypatch, df, mode):
+    captured = []
+
+    @contextmanager
+    def connection(allow_local_infile=False):
+        yield FakeConnection(captured)
+
+    monkeypatch.setattr(save_logs_to_mysql, "connection", connection)
+    save_logs_to_mysql.save_to_database(df, "access_logs", mode=mode, batch_size=2)
+    return captured
+
+# Werte so, wie MySQL sie aus der LOAD-DATA-Datei liest
+def as_text(row):
+    return tuple(
+        None if value is None
+        else value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime)
+        else str(value)
+        for value in row
+    )
+
+@pytest.fixture
+def frame_with_missing_values():
+    return pd.DataFrame({
+        "ip": ["1.2.3.4", "5.6.7.8", None],
+        "timestamp": pd.to_datetime(["2024-12-14 14:36:34", None, "2024-12-14 14:36:36"]),
+        "status": [200, 404, 500],
+        "size": [1.0, np.nan, 2273.0],
+        "user_agent": ["Mozilla\t5.0", "curl", "a\\b"],
+    })
+
+def test_load_data_matches_row_mode(monkeypatch, frame_with_missing_values):
+    row_mode = saved_rows(monkeypatch, frame_with_missing_values, "row")
+    load_data = saved_rows(monkeypatch, frame_with_missing_values, "load_data")
+
+    assert len(load_data) == len(row_mode) == 3
+    # MySQL dekodiert \t und \\ beim Laden; hier wird die kodierte Form verglichen
+    decoded = [
+        tuple(value.replace("\\t", "\t").replace("\\\\", "\\") if value is not None else None for value in row)
+        for row in load_data
+    ]
+    assert decoded == [as_text(row) for row in row_mode]
+
+def test_integer_columns_with_missing_values_stay_integers(monkeypatch, frame_with_missing_values):
+    for mode in ("row", "executemany"):
+        rows = saved_rows(monkeypatch, frame_with_missing_values, mode)
+        assert [row[3] for row in rows] == [1, None, 2273]
+        assert all(type(row[3]) is int for row in rows if row[3] is not None)
+    load_data = saved_rows(monkeypatch, frame_with_missing_values, "load_data")
+    assert [row[3] for row in load_data] == ["1", None, "2273"]
@@ -0,0 +1,97 @@
+# File: text_model_store.py
+
+import os
+import json
+from datetime import datetime
+import joblib
+from forest_arrays import export_forest
+
+# Gespeicherte Klassifikatoren für /predict-text: Jede Version liegt unter
+# models/text_classifier/<Version>/, die Datei LATEST verweist auf die aktuelle Version.
+# Die Artefakte werden unkomprimiert gespeichert, damit joblib die NumPy-Arrays mit
+# mmap_mode="r" aus der Datei abbilden kann. Ohne Kopie und mit gemeinsamen Seiten im
+# Page-Cache für mehrere Worker lädt nur das Backend "arrays" (forest_arrays.py): Die
+# sklearn-Bäume kopieren ihre Knoten beim Laden (__setstate__) in eigenen Speicher.
+TEXT_MODEL_FOLDER = os.path.join("models", "text_classifier")
+LATEST_FILE = "LATEST"
+CLASSIFIER_FILE = "classifier.joblib"
+PIPELINE_FILE = "pipeline.joblib"
+FOREST_FILE = "forest_arrays.joblib"
+METADATA_FILE = "metadata.json"
+
+# Version, auf die LATEST verweist, oder None, wenn noch nichts gespeichert wurde
+def latest_text_model_version(model_folder=TEXT_MODEL_FOLDER):
+    try:
+        with open(os.path.join(model_folder, LATEST_FILE), "r") as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def text_model_versions(model_folder=TEXT_MODEL_FOLDER):
+    if not os.path.isdir(model_folder):
+        return []
+    return sorted(
+        name for name in os.listdir(model_folder)
+        if os.path.isfile(os.path.join(model_folder, name, METADATA_FILE))
+    )
+
+# Neuen Versionsordner anlegen. Der Name enthält Mikrosekunden und ist damit sortierbar
+# und praktisch eindeutig; existiert er trotzdem schon (zwei Speicherungen in derselben
+# Mikrosekunde), wird mit einem neuen Zeitstempel erneut versucht.
+def create_version_folder(model_folder):
+    os.makedirs(model_folder, exist_ok=True)
+    while True:
+        version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        folder = os.path.join(model_folder, version)
+        try:
+            os.mkdir(folder)
+            return version, folder
+        except FileExistsError:
+            continue
+
+# Klassifikator und Pipeline als neue Version speichern und LATEST erst danach umstellen,
+# damit ein laufender Server nie eine halb geschriebene Version lädt
+def save_text_model(model, text_pipeline, metadata=None, model_folder=TEXT_MODEL_FOLDER):
+    version, folder = create_version_folder(model_folder)
+
+    joblib.dump(model, os.path.join(folder, CLASSIFIER_FILE))
+    joblib.dump(text_pipeline, os.path.join(folder, PIPELINE_FILE))
+    # RandomForest zusätzlich als flache Arrays für das Backend "arrays" (forest_arrays.py)
+    if hasattr(model, "estimators_"):
+        joblib.dump(export_forest(model), os.path.join(folder, FOREST_FILE))
+    metadata = dict(metadata or {}, version=version, created=datetime.now().isoformat(timespec="seconds"))
+    with open(os.path.join(folder, METADATA_FILE), "w", encoding="utf-8") as file:
+        json.dump(metadata, file, indent=2)
+
+    latest_path = os.path.join(model_folder, LATEST_FILE)
+    tmp_path = f"{latest_path}.{version}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write(version + "\n")
+    os.replace(tmp_path, latest_path)
+    return version
+
+# Gespeicherte Version laden (ohne version die aktuelle), None falls keine vorhanden.
+# backend="arrays" lädt statt des sklearn-Modells das ArrayForest aus forest_arrays.py.
+def load_text_model(version=None, model_folder=TEXT_MODEL_FOLDER, mmap_mode="r", backend="sklearn"):
+    version = version or latest_text_model_version(model_folder)
+    if version is None:
+        return None
+    if version not in text_model_versions(model_folder):
+        raise ValueError(f"Modellversion {version} nicht gefunden.")
+    folder = os.path.join(model_folder, version)
+
+    with open(os.path.join(folder, METADATA_FILE), "r", encoding="utf-8") as file:
+        metadata = json.load(file)
+    forest_path = os.path.join(folder, FOREST_FILE)
+    if backend == "arrays" and os.path.isfile(forest_path):
+        model = joblib.load(forest_path, mmap_mode=mmap_mode)
+    else:
+        model = joblib.load(os.path.join(folder, CLASSIFIER_FILE), mmap_mode=mmap_mode)
+        if backend == "arrays":
+            model = export_forest(model)
+    return {
+        "model": model,
+        "pipeline": joblib.load(os.path.join(folder, PIPELINE_FILE), mmap_mode=mmap_mode),
+        "version": version,
+        "metadata": metadata,
+    }
@@ -0,0 +1,107 @@
+# File: upload_lines.py
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+# Zeilen einer Datei aus einem multipart/form-data-Upload lesen, während der Upload
+# noch eintrifft: Jeder empfangene Block wird sofort geparst, im Speicher bleibt nur
+# die aktuell unvollständige Zeile. Zeilen über max_line_bytes werden nicht gespeichert,
+# damit auch Dateien ohne Zeilenumbrüche den Speicher nicht füllen; sie kommen als None
+# (gezählt in too_long), so bleibt die Zeilennummerierung die der Datei.
+class MultipartLineReader:
+    def __init__(self, boundary, field_name="file", max_line_bytes=65536):
+        self.field_name = field_name.encode("utf-8")
+        self.max_line_bytes = max_line_bytes
+        self.lines = []
+        self.partial = bytearray()
+        self.skipping = False
+        self.too_long = 0
+        self.active = False
+        self.header_field = b""
+        self.header_value = b""
+        self.part_name = None
+        self.parser = MultipartParser(boundary, {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        })
+
+    def on_part_begin(self):
+        self.part_name = None
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_header_field(self, data, start, end):
+        self.header_field += data[start:end]
+
+    def on_header_value(self, data, start, end):
+        self.header_value += data[start:end]
+
+    def on_header_end(self):
+        if self.header_field.lower() == b"content-disposition":
+            _, options = parse_options_header(self.header_value)
+            self.part_name = options.get(b"name")
+        self.header_field = b""
+        self.header_value = b""
+
+    def on_headers_finished(self):
+        self.active = self.part_name == self.field_name
+
+    def on_part_data(self, data, start, end):
+        if not self.active:
+            return
+        while start < end:
+            newline = data.find(b"\n", start, end)
+            stop = end if newline == -1 else newline
+            if not self.skipping:
+                self.partial += data[start:stop]
+                if len(self.partial) > self.max_line_bytes:
+                    self.partial.clear()
+                    self.skipping = True
+                    self.too_long += 1
+            if newline == -1:
+                break
+            self.finish_line()
+            start = newline + 1
+
+    def on_part_end(self):
+        if self.active and (self.partial or self.skipping):
+            self.finish_line()
+        self.active = False
+
+    def finish_line(self):
+        if self.skipping:
+            self.lines.append(None)
+        else:
+            self.lines.append(self.partial.decode("utf-8", errors="replace").rstrip("\r"))
+        self.partial.clear()
+        self.skipping = False
+
+    # Block des Request-Bodys parsen und die darin abgeschlossenen Zeilen zurückgeben
+    def feed(self, chunk):
+        self.parser.write(chunk)
+        lines, self.lines = self.lines, []
+        return lines
+
+    def finish(self):
+        self.parser.finalize()
+        lines, self.lines = self.lines, []
+        return lines
+
+    # Zeilen aus einer asynchronen Folge von Body-Blöcken (z. B. request.stream())
+    async def iter_lines(self, chunks):
+        async for chunk in chunks:
+            for line in self.feed(chunk):
+                yield line
+        for line in self.finish():
+            yield line
+
+# Boundary aus dem Content-Type eines multipart/form-data-Requests oder None
+def multipart_boundary(content_type):
+    media_type, options = parse_options_header(content_type)
+    if media_type != b"multipart/form-data":
+        return None
+    return options.get(b"boundary")
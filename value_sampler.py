@@ -0,0 +1,72 @@
+# File: value_sampler.py
+
+import random
+import logging
+
+# Zufällige Werte (ip, user, url) für /random ohne ORDER BY RAND(): Eine Stichprobe
+# wird über zufällige Primärschlüssel im Bereich MIN(id)..MAX(id) gezogen (reine
+# Index-Zugriffe) und als Liste verschiedener Werte im Speicher gehalten.
+# refresh() erneuert die Stichprobe regelmäßig, sample() antwortet ohne Datenbank.
+class ValueSampler:
+    def __init__(self, connection, table_name, attributes, sample_size=10000, batch_size=1000):
+        # connection() liefert einen Kontextmanager mit einer Datenbankverbindung
+        self.connection = connection
+        self.table_name = table_name
+        self.attributes = list(attributes)
+        self.sample_size = sample_size
+        self.batch_size = batch_size
+        self.values = {attribute: [] for attribute in self.attributes}
+        self.rng = random.Random()
+
+    # Zufälligen Wert aus der Stichprobe oder None, falls (noch) keine Werte vorliegen
+    def sample(self, attribute):
+        values = self.values.get(attribute)
+        if not values:
+            return None
+        return self.rng.choice(values)
+
+    # Zufällige Schlüssel ziehen und die verschiedenen Werte je Attribut sammeln;
+    # None bei leerer Tabelle
+    def fetch_sample(self, cursor):
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {self.table_name}")
+        min_id, max_id = cursor.fetchone()
+        if min_id is None:
+            return None
+
+        # Lücken im id-Bereich liefern einfach keine Zeile
+        id_count = max_id - min_id + 1
+        ids = self.rng.sample(range(min_id, max_id + 1), min(self.sample_size, id_count))
+        columns = ", ".join(self.attributes)
+        found = {attribute: set() for attribute in self.attributes}
+        for start in range(0, len(ids), self.batch_size):
+            batch = ids[start:start + self.batch_size]
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(f"SELECT {columns} FROM {self.table_name} WHERE id IN ({placeholders})", batch)
+            for row in cursor.fetchall():
+                for attribute, value in zip(self.attributes, row):
+                    if value is not None:
+                        found[attribute].add(value)
+        return found
+
+    # Stichprobe neu ziehen; bei Fehlern bleibt die bisherige Stichprobe erhalten
+    def refresh(self):
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    found = self.fetch_sample(cursor)
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logging.error(f"[ERROR] Stichprobe für {self.table_name} nicht aktualisiert: {str(e)}")
+            return False
+        if found is None:
+            return True
+
+        # Listen werden als Ganzes ersetzt, sample() sieht immer eine vollständige Stichprobe
+        self.values = {attribute: sorted(values) for attribute, values in found.items()}
+        logging.info(
+            f"[INFO] Stichprobe für {self.table_name} aktualisiert: "
+            + ", ".join(f"{attribute}={len(values)}" for attribute, values in self.values.items())
+        )
+        return True